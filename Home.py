@@ -1,16 +1,19 @@
 from datetime import datetime
 import os
-import sys
 import time
 import pandas as pd
 import streamlit as st
 import toml
 import utility_functions as uf
-from moviepy import VideoFileClip
 import overlay_settings as settings_overlay
-from PySide6.QtWidgets import QApplication
-if not QApplication.instance():
-    app = QApplication(sys.argv)
+import media_cache as mc
+import media_probe as mp
+import proxy_media as pm
+import reader_pool as rpool
+import subtitle_parser as sp
+import workspace as ws
+import image_generator as ig
+ig.warm_up()
 
 # ==============================
 # seo configuration
@@ -94,33 +97,60 @@ if "video_temp" not in st.session_state:
 if "video_key" not in st.session_state:
     st.session_state.video_key = uf.generate_key("video")
 
+# Temp files written by this run belong to this session's workspace
+ws.bind_session(mc.session_owner())
+workspace_stats = ws.get_workspace().stats()
+st.sidebar.caption(
+    f"Workspace: {workspace_stats['bytes'] / 1e6:.0f} / {workspace_stats['quota_bytes'] / 1e6:.0f} MB "
+    f"in {workspace_stats['artifacts']} files, {workspace_stats['evictions']} evicted"
+)
+
     # ==============================
     # Upload Video
     # ==============================
 video_file = st.file_uploader("Upload a video", type=["mp4", "mov", "avi"], key=st.session_state.video_key)
 if video_file:
-    st.session_state.video_temp = uf.save_temp_file(video_file, ".mp4")
-    clip = VideoFileClip(st.session_state.video_temp)
+    # Written once per upload; a video reader is only opened for moviepy renders
+    st.session_state.video_temp = mc.store_upload(video_file, ".mp4")
 
     # -----------------------------
-    # Show Video Details
+    # Show Video Details (ffprobe metadata, cached per content hash)
     # -----------------------------
+    try:
+        info = mp.probe_media(st.session_state.video_temp, mc.content_key(st.session_state.video_temp))
+    except RuntimeError as e:
+        st.error(f"❌ Could not read this file's media info: {e}")
+        st.stop()
+    if not info["width"] or not info["height"]:
+        st.error("❌ This file has no video stream. Please upload a video.")
+        st.stop()
     st.subheader("Video Details")
     col1, col2, col3, col4 = st.columns(4)
-    col1.success(f"{clip.duration:.2f}s")
-    col2.success(f"{clip.w}x{clip.h}")
-    col3.success(f"{clip.fps} FPS")
+    col1.success(f"{info['duration'] or 0:.2f}s")
+    col2.success(f"{info['width']}x{info['height']}")
+    col3.success(f"{info['fps']:g} FPS" if info["fps"] else "Unknown FPS")
+    col4.success(f"{info['n_frames']} frames" if info["n_frames"] else "Unknown frames")
+
+    col5, col6, col7, col8 = st.columns(4)
+    col5.info(f"Video: {info['video_codec'] or 'unknown'}")
+    col6.info(f"Audio: {info['audio_codec'] or 'none'}")
+    col7.info(f"{info['keyframes']} keyframes" if info["keyframes"] is not None
+              else f"Keyframes: {info['keyframes_status']}")
+    col8.info(f"{info['size_bytes'] / 1e6:.1f} MB")
+
+    reader_stats = rpool.get_pool().stats()
+    st.sidebar.caption(
+        f"Video readers: {reader_stats['open_readers']}/{reader_stats['max_readers']} open, "
+        f"{reader_stats['readers_by_session'].get(mc.session_owner(), 0)} held by this session"
+    )
 
     # -----------------------------
-    # n_frames may not always be available; guard it
+    # Low-res proxy for previews and draft renders
     # -----------------------------
-    n_frames = getattr(getattr(clip, "reader", None), "n_frames", None)
-    if n_frames is None:
-        try:
-            n_frames = int(clip.duration * clip.fps)
-        except Exception:
-            n_frames = "Unknown"
-    col4.success(f"{n_frames} frames")
+    # Renders and previews look the job up again with pm.get_proxy
+    proxy_job = pm.request_proxy(st.session_state.video_temp, info["width"], info["height"])
+    if proxy_job is not None:
+        st.caption(f"Editing proxy ({proxy_job.size[0]}x{proxy_job.size[1]}): {proxy_job.status}")
 
     manual_entry,upload_files = st.tabs(["Manual Entry", "Upload Overlays File"])
 
@@ -142,31 +172,39 @@ if video_file:
         # --- Start Time ---
         # -----------------------------
         st.subheader("Set Overlay Timing")
-        sh, sm, ss = st.columns(3)
+        sh, sm, ss, sms = st.columns(4)
         with sh:
-            start_h = st.number_input("Start Hour", min_value=0, max_value=int(clip.duration // 3600), value=0)
+            start_h = st.number_input("Start Hour", min_value=0, max_value=int((info["duration"] or 0) // 3600), value=0)
         with sm:
             start_m = st.number_input("Start Minute 0 - 59", min_value=0, max_value=59, value=0)
         with ss:
             start_s = st.number_input("Start Second 0 -59", min_value=0, max_value=59, value=0)
-        start_time = uf.hms_to_seconds(start_h, start_m, start_s)
+        with sms:
+            start_ms = st.number_input("Start Millisecond 0 - 999", min_value=0, max_value=999, value=0, step=10)
+        start_time = uf.hms_to_ms(start_h, start_m, start_s, start_ms)
         
         # -----------------------------
         # --- End Time ---
         # -----------------------------
-        eh, em, es = st.columns(3)
+        eh, em, es, ems = st.columns(4)
         with eh:
-            end_h = st.number_input("End Hour", min_value=0, max_value=int(clip.duration // 3600), value=0)
+            end_h = st.number_input("End Hour", min_value=0, max_value=int((info["duration"] or 0) // 3600), value=0)
         with em:
             end_m = st.number_input("End Minute 0 - 59", min_value=0, max_value=59, value=0)
         with es:
-            end_s = st.number_input("End Second 0 - 59", min_value=0, max_value=59, value=min(5, int(clip.duration)))
-        end_time = uf.hms_to_seconds(end_h, end_m, end_s)
+            end_s = st.number_input("End Second 0 - 59", min_value=0, max_value=59, value=min(5, int(info["duration"] or 0)))
+        with ems:
+            end_ms = st.number_input("End Millisecond 0 - 999", min_value=0, max_value=999, value=0, step=10)
+        end_time = uf.hms_to_ms(end_h, end_m, end_s, end_ms)
 
         # -----------------------------
         # Add Manual overlay Button
         # -----------------------------
         overlay_settings_data = settings_overlay.overlay_setting_fields("manual_text_overlay_key")
+        draft_overlay = None
+        if user_text.strip() and end_time > start_time:
+            draft_overlay = settings_overlay.make_overlay_entry(user_text, start_time, end_time, overlay_settings_data)
+        settings_overlay.show_preview(st.session_state.video_temp, "manual_text", target="manual_overlays", draft=draft_overlay)
         if st.button("➕ Add Overlay", help='Add the overlay with the specified settings'):
             if user_text.strip() == "":
                 st.warning("Please enter some text!")
@@ -174,7 +212,7 @@ if video_file:
                 st.warning("End time must be greater than start time.")
             else:
                 settings_overlay.add_overlay_entry(user_text, start_time, end_time, overlay_settings_data,target="manual_overlays")
-                st.success(f'✅ Overlay added: "{user_text}" ({start_time}-{end_time}s)')
+                st.success(f'✅ Overlay added: "{user_text}" ({uf.format_ms(start_time)} - {uf.format_ms(end_time)})')
                 st.info("💡 Add overlays one by one, then click **'Generate Video'**.")
 
         if st.session_state.manual_overlays:
@@ -188,12 +226,12 @@ if video_file:
             # -----------------------------
             # Generate Manual Text Final Video
             # -----------------------------
-            settings_overlay.generate_finel_video(clip,"generate_from_manual_video_key",target='manual_overlays')
+            settings_overlay.generate_finel_video(st.session_state.video_temp,"generate_from_manual_video_key",target='manual_overlays')
             
             # -----------------------------
             # Clear All Button
             # -----------------------------
-            settings_overlay.clear_all(clip, "manual_text_data_cleared_key", target="manual_overlays")
+            settings_overlay.clear_all("manual_text_data_cleared_key", target="manual_overlays")
     with upload_files:
 
         # ==============================
@@ -213,12 +251,13 @@ if video_file:
         # ==============================
         # Upload Overlay File
         # ==============================
-        st.header("Upload (CSV or Excel) Subtitles File")
+        st.header("Upload (CSV, Excel or SRT/WebVTT/ASS) Subtitles File")
         overlay_file = st.file_uploader(
-            "Upload CSV/Excel",
-            type=["csv", "xlsx"],
+            "Upload CSV/Excel/Subtitles",
+            type=["csv", "xlsx", "srt", "vtt", "ass", "ssa"],
             key=st.session_state.overlays_key,
-            help="Excel or CSV must contain: text, start, end columns"
+            help="Excel or CSV must contain: text, start, end columns. "
+                 "SRT, WebVTT and ASS cues are read directly, including their text colours."
         )
 
         st.page_link(
@@ -227,9 +266,19 @@ if video_file:
         )
 
         if overlay_file is not None:
-            ext = ".csv" if overlay_file.name.endswith(".csv") else ".xlsx"
-            st.session_state.overlays_temp = uf.save_temp_file(overlay_file, ext)
-            if overlay_file.name.endswith(".csv"):
+            ext = os.path.splitext(overlay_file.name)[1].lower()
+            st.session_state.overlays_temp = mc.store_upload(overlay_file, ext)
+            subtitle_format = sp.subtitle_format(overlay_file.name)
+            df = None
+            if subtitle_format:
+                # Cues become text/start/end(/color) rows, edited like a CSV
+                try:
+                    df = pd.DataFrame.from_records(
+                        sp.iter_cues(st.session_state.overlays_temp, subtitle_format), columns=sp.CUE_FIELDS
+                    )
+                except ValueError as e:
+                    st.error(f"❌ Could not read {overlay_file.name}: {e}. The file was skipped.")
+            elif ext == ".csv":
                 df = pd.read_csv(st.session_state.overlays_temp)
             else:
                 df = pd.read_excel(st.session_state.overlays_temp)
@@ -238,11 +287,11 @@ if video_file:
             # required overlay columns (same fields as your manual app)
             # ==============================
             required_cols = ["text", "start", "end"]
-            missing_cols = [c for c in required_cols if c not in df.columns]
+            missing_cols = [] if df is None else [c for c in required_cols if c not in df.columns]
 
             if missing_cols:
                 st.error(f"❌ Missing columns: {missing_cols}")
-            else:
+            elif df is not None:
                 st.success("✅ File loaded successfully!")
                 st.write("Preview & Edit:")
                 edited_df = st.data_editor(df, num_rows="dynamic")
@@ -252,15 +301,20 @@ if video_file:
                 # ==============================
                 overlay_settings_data = settings_overlay.overlay_setting_fields("file_text_overlay_key")
                 if st.button("➕ Add Overlays",help='Add all overlays with specified settings'):
-                    for _, overlay in edited_df.iterrows():
-                        if str(overlay.get("text", "")).strip() == "":
-                            st.warning("Please enter some text!")
-                        elif int(overlay['start']) >= int(overlay['end']):
-                            st.warning("End time must be greater than start time.")
-                        else:
-                            settings_overlay.add_overlay_entry(overlay['text'], overlay['start'], overlay['end'], overlay_settings_data,target="file_overlays")
-                            st.success(f'✅ Overlay added: \"{overlay['text']}\" ({overlay['start']}-{overlay['end']}s)')
-                    st.info("💡 All valid overlays from file have been added. Click **'Generate Video'**.")                        
+                    # Validate and add every row in one pass, then report once
+                    added, rejected = settings_overlay.add_overlay_entries(
+                        edited_df, overlay_settings_data, target="file_overlays"
+                    )
+                    if added:
+                        st.success(f"✅ {added} overlays added from {len(edited_df)} rows.")
+                    if len(rejected):
+                        st.warning(f"⚠️ {len(rejected)} rows skipped: " + ", ".join(
+                            f"{reason} ({count})" for reason, count in rejected["reason"].value_counts().items()
+                        ))
+                        with st.expander("Skipped rows"):
+                            st.dataframe(rejected, use_container_width=True)
+                    if added:
+                        st.info("💡 All valid overlays from file have been added. Click **'Generate Video'**.")                        
         if st.session_state.file_overlays:
             st.subheader("Current Overlays")
 
@@ -268,22 +322,23 @@ if video_file:
             # Show Current Overlays
             # -----------------------------
             settings_overlay.show_current_overlays("file_text",target="file_overlays")
+            settings_overlay.show_preview(st.session_state.video_temp, "file_text", target="file_overlays")
             
             # -----------------------------
             # Generate Final Video
             # -----------------------------
-            settings_overlay.generate_finel_video(clip=clip,key_suffix="generate_from_file_video_key",target="file_overlays")
+            settings_overlay.generate_finel_video(video_path=st.session_state.video_temp,key_suffix="generate_from_file_video_key",target="file_overlays")
   
             # -----------------------------
             # Clear All Button
             # -----------------------------
-            settings_overlay.clear_all(clip, "file_text_data_cleared_key", target="file_overlays")
+            settings_overlay.clear_all("file_text_data_cleared_key", target="file_overlays")
     st.divider()
     reset_header,clear_all = st.columns([5.5,1])
     with reset_header:
         st.subheader("Reset Application")
     with clear_all:
-        settings_overlay.clear_all(clip, "all_data_cleared_key", target="video")
+        settings_overlay.clear_all("all_data_cleared_key", target="video")
 
 # Footer
 st.write("---")
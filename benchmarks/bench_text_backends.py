@@ -0,0 +1,86 @@
+"""
+Compare the Qt and Pillow text backends.
+
+Reports cold-start time (fresh interpreter: import + warm_up) and per-cue
+render latency for a mix of short, long and multi-line subtitle cues.
+
+    python benchmarks/bench_text_backends.py [--cues 500] [--backends qt pillow]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_CUES = [
+    "♪",
+    "[Applause]",
+    "SPEAKER 1: Where were you last night?",
+    "This is a considerably longer subtitle line that should wrap onto a second line in the overlay",
+    "Two lines\nof dialogue",
+]
+
+STARTUP_SNIPPET = (
+    "import sys, time; t = time.perf_counter(); sys.path.insert(0, {root!r}); "
+    "import image_generator as ig; ig.warm_up({backend!r}); "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_startup(backend, runs=3):
+    times = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", STARTUP_SNIPPET.format(root=ROOT, backend=backend)],
+            capture_output=True, text=True, check=True
+        )
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return min(times)
+
+
+def measure_render(backend, n_cues):
+    import image_generator as ig
+    import font_registry as fr
+
+    ig.warm_up(backend)
+    font_path = fr.bundled_fonts().get("arial")
+    latencies = []
+    for i in range(n_cues):
+        text = SAMPLE_CUES[i % len(SAMPLE_CUES)]
+        t = time.perf_counter()
+        ig.render_text_rgba(
+            text,
+            font_path=font_path,
+            font_size=22,
+            bg_color=(0, 0, 0),
+            bg_opacity=0.7,
+            padding=15,
+            backend=backend
+        )
+        latencies.append(time.perf_counter() - t)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cues", type=int, default=500)
+    parser.add_argument("--backends", nargs="+", default=["qt", "pillow"])
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'startup s':>10} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for backend in args.backends:
+        startup = measure_startup(backend)
+        latencies = sorted(measure_render(backend, args.cues))
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(
+            f"{backend:<8} {startup:>10.3f} {statistics.mean(latencies) * 1e3:>9.3f} "
+            f"{statistics.median(latencies) * 1e3:>8.3f} {p95 * 1e3:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
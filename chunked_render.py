@@ -0,0 +1,105 @@
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import encoder_profiles as ep
+import media_tools as mt
+import overlay_compositor as comp
+import render_pipeline as rp
+import workspace as ws
+
+# ==============================
+# Chunked parallel rendering
+# ==============================
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", "0")) or (os.cpu_count() or 1)
+# Chunks shorter than this aren't worth a process of their own
+MIN_CHUNK_SECONDS = float(os.environ.get("RENDER_MIN_CHUNK_SECONDS", "10"))
+
+
+def split_at_keyframes(keyframes, duration, n_chunks):
+    """
+    Pick up to ``n_chunks`` keyframe-aligned ``(start, end)`` ranges of
+    roughly equal length covering ``[0, duration)``.
+    """
+    keyframes = sorted(k for k in keyframes if 0.0 < k < duration)
+    cuts = []
+    for i in range(1, n_chunks):
+        target = duration * i / n_chunks
+        if not keyframes:
+            break
+        nearest = min(keyframes, key=lambda k: abs(k - target))
+        if (not cuts or nearest > cuts[-1]) and nearest - (cuts[-1] if cuts else 0.0) >= MIN_CHUNK_SECONDS:
+            cuts.append(nearest)
+    bounds = [0.0, *cuts, duration]
+    return list(zip(bounds, bounds[1:]))
+
+
+def layers_for_chunk(layers, start, end):
+    """Layers intersecting ``[start, end)``, shifted to chunk-local time."""
+    return [
+        comp.OverlayLayer(layer.premul_rgb, layer.alpha, layer.x, layer.y,
+                          layer.start - start, layer.end - start)
+        for layer in layers
+        if layer.start < end and layer.end > start
+    ]
+
+
+def _render_chunk(source_path, layers, start, end, out_path, width, height, fps, video_args):
+    duration = end - start
+    compositor = comp.OverlayCompositor(layers, duration=duration)
+    pipeline = rp.RenderPipeline(
+        source_path, compositor, out_path, width, height, fps,
+        video_args=video_args, start=start, duration=duration, include_audio=False
+    )
+    stats = pipeline.run()
+    return {"start": start, "end": end, "frames": stats["stages"][-1]["frames"]}
+
+
+def threads_per_worker(workers):
+    """Encoder threads each of ``workers`` processes may use without oversubscribing the CPU."""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def chunked_render(source_path, layers, output_path, width, height, fps, duration,
+                   workers=RENDER_WORKERS, profile=None, progress=None):
+    """
+    Split the source at keyframes, render each chunk with its own overlays in
+    a separate process, then join the chunks losslessly and mux the source
+    audio back in. ``progress(done, total)`` is called as chunks finish.
+    """
+    started = time.perf_counter()
+    chunks = split_at_keyframes(mt.probe_keyframes(source_path), duration, max(1, workers))
+    workers = min(workers, len(chunks))
+    # Each worker runs its own x264, so split the cores between them
+    video_args = ep.video_args(profile, (width, height), max_threads=threads_per_worker(workers))
+
+    work_dir = ws.get_workspace().make_job_dir(prefix="chunked_render_")
+    try:
+        chunk_paths = [os.path.join(work_dir, f"chunk_{i:04d}.mp4") for i in range(len(chunks))]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn")
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _render_chunk, source_path, layers_for_chunk(layers, start, end),
+                    start, end, chunk_path, width, height, fps, video_args
+                )
+                for (start, end), chunk_path in zip(chunks, chunk_paths)
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                future.result()
+                if progress:
+                    progress(done, len(chunks))
+
+        video_only = os.path.join(work_dir, "video_only.mp4")
+        mt.concat_copy(chunk_paths, video_only, os.path.join(work_dir, "chunks.txt"))
+        mt.mux_source_audio(video_only, source_path, output_path)
+    finally:
+        ws.get_workspace().remove_job_dir(work_dir)
+
+    return {
+        "chunks": len(chunks),
+        "workers": workers,
+        "elapsed_seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,103 @@
+import os
+import media_tools as mt
+
+# ==============================
+# Encoder Profiles
+# ==============================
+# threads: x264 encoder threads; 0 lets x264 pick about 1.5 per core. Drafts
+# are quick previews, so they keep to a few threads and leave the rest of the
+# machine to other sessions.
+PROFILES = {
+    "draft": {
+        "preset": "ultrafast",
+        "crf": 28,
+        "tune": "fastdecode",
+        "threads": 2,
+        "audio_copy": True,
+    },
+    "balanced": {
+        "preset": "medium",
+        "crf": 23,
+        "tune": None,
+        "threads": 0,
+        "audio_copy": True,
+    },
+    "archive": {
+        "preset": "slow",
+        "crf": 18,
+        "tune": "film",
+        "threads": 0,
+        "audio_copy": True,
+    },
+}
+DEFAULT_PROFILE = os.environ.get("ENCODER_PROFILE", "balanced")
+
+# Audio codecs that can be stream-copied into an MP4 container
+MP4_AUDIO_COPY_CODECS = {"aac", "mp3", "ac3", "eac3", "alac"}
+
+
+def get_profile(name=None):
+    return PROFILES.get(name or DEFAULT_PROFILE, PROFILES["balanced"])
+
+
+def pix_fmt_args(size=None):
+    """
+    ``-pix_fmt yuv420p`` when the frame size is known and both sides are even.
+
+    libx264 rejects yuv420p at odd widths or heights, so (like moviepy) the
+    flag is left out otherwise and x264 picks a format that fits the input.
+    """
+    if size is None:
+        return []
+    width, height = size
+    return ["-pix_fmt", "yuv420p"] if width % 2 == 0 and height % 2 == 0 else []
+
+
+def encoder_threads(name=None, max_threads=None):
+    """The profile's thread count, capped at ``max_threads`` (0 = x264 auto)."""
+    threads = get_profile(name)["threads"]
+    if max_threads:
+        threads = min(threads, max_threads) if threads else max_threads
+    return threads
+
+
+def video_args(name=None, size=None, max_threads=None):
+    """
+    ffmpeg output arguments for the libx264 video stream of ``size`` (w, h)
+    frames, using at most ``max_threads`` encoder threads when given.
+    """
+    profile = get_profile(name)
+    args = ["-c:v", "libx264", "-preset", profile["preset"], "-crf", str(profile["crf"]),
+            *pix_fmt_args(size), "-threads", str(encoder_threads(name, max_threads))]
+    if profile["tune"]:
+        args += ["-tune", profile["tune"]]
+    return args
+
+
+def can_copy_audio(name, source_path):
+    """True when the profile allows it and the source audio fits an MP4 as-is."""
+    if not get_profile(name)["audio_copy"]:
+        return False
+    try:
+        return mt.probe_audio_codec(source_path) in MP4_AUDIO_COPY_CODECS
+    except RuntimeError:
+        return False
+
+
+def audio_args(name, source_path):
+    """ffmpeg output arguments for the audio stream: copy when possible, else AAC."""
+    return ["-c:a", "copy"] if can_copy_audio(name, source_path) else ["-c:a", "aac"]
+
+
+def moviepy_write_kwargs(name=None, size=None):
+    """Keyword arguments for moviepy's write_videofile of ``size`` frames (audio handled by the caller)."""
+    profile = get_profile(name)
+    ffmpeg_params = ["-crf", str(profile["crf"]), *pix_fmt_args(size)]
+    if profile["tune"]:
+        ffmpeg_params += ["-tune", profile["tune"]]
+    return {
+        "codec": "libx264",
+        "preset": profile["preset"],
+        "threads": encoder_threads(name) or None,
+        "ffmpeg_params": ffmpeg_params,
+    }
@@ -0,0 +1,138 @@
+import os
+import subprocess
+import threading
+import time
+import numpy as np
+from PIL import Image
+import media_tools as mt
+import workspace as ws
+
+# ==============================
+# ffmpeg filter-graph burn-in engine
+# ==============================
+# Every span's flattened layers are drawn onto one shared canvas (the union
+# box of all layers) and the canvases are played back as a single timed input via
+# the concat demuxer. The graph is one overlay filter however many cues there
+# are, so open inputs and per-frame filter work stay constant.
+
+
+def unpremultiply(layer):
+    """Straight-alpha RGBA array for a premultiplied OverlayLayer."""
+    alpha = layer.alpha.astype(np.uint32)
+    safe = np.maximum(alpha, 1)[:, :, None]
+    rgb = (layer.premul_rgb.astype(np.uint32) * 255 + safe // 2) // safe
+    rgb = np.minimum(rgb, 255).astype(np.uint8)
+    return np.dstack([rgb, layer.alpha])
+
+
+def _escape(path):
+    return os.path.abspath(path).replace("'", "'\\''")
+
+
+def _canvas_box(layers):
+    x0 = min(layer.x for layer in layers)
+    y0 = min(layer.y for layer in layers)
+    x1 = max(layer.x + layer.w for layer in layers)
+    y1 = max(layer.y + layer.h for layer in layers)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _canvas_key(span):
+    return tuple(id(layer) for layer in span.layers)
+
+
+def build_filter_graph(spans, work_dir):
+    """
+    Write one canvas PNG per distinct set of flattened layers plus a concat
+    list that times them to the spans, and build the overlay graph.
+
+    Returns ``(concat_path, filter_graph)``; ``concat_path`` is None when no
+    span carries an overlay. Input 0 is the source video, input 1 the canvases.
+    """
+    canvases = {}
+    for span in spans:
+        if not span.passthrough:
+            canvases.setdefault(_canvas_key(span), span.layers)
+    if not canvases:
+        return None, "[0:v]null[vout]"
+
+    x0, y0, w, h = _canvas_box([layer for layers in canvases.values() for layer in layers])
+    blank_path = os.path.join(work_dir, "blank.png")
+    Image.new("RGBA", (w, h)).save(blank_path, compress_level=1)
+    png_paths = {}
+    for n, (key, layers) in enumerate(canvases.items(), 1):
+        canvas = np.zeros((h, w, 4), dtype=np.uint8)
+        # A span's layers never overlap each other, so each is simply copied in
+        for layer in layers:
+            canvas[layer.y - y0:layer.y - y0 + layer.h, layer.x - x0:layer.x - x0 + layer.w] = unpremultiply(layer)
+        png_paths[key] = os.path.join(work_dir, f"layer_{n:05d}.png")
+        Image.fromarray(canvas, "RGBA").save(png_paths[key], compress_level=1)
+
+    entries = []
+    if spans[0].start > 0:
+        entries.append((blank_path, spans[0].start))
+    for span in spans:
+        path = blank_path if span.passthrough else png_paths[_canvas_key(span)]
+        entries.append((path, span.end - span.start))
+    concat_path = os.path.join(work_dir, "layers.ffconcat")
+    with open(concat_path, "w") as f:
+        f.write("ffconcat version 1.0\n")
+        # framerate 1000 gives each PNG a millisecond time base, so canvas switches
+        # aren't rounded to image2's default 25 fps; eof_action=repeat then holds
+        # the last canvas to the end of the video
+        for path, duration in entries:
+            f.write(f"file '{_escape(path)}'\noption framerate 1000\nduration {duration:.6f}\n")
+
+    # Pixel format comes from the output args: yuv420p only fits even frame sizes
+    return concat_path, f"[0:v][1:v]overlay=x={x0}:y={y0}:eof_action=repeat:format=auto[vout]"
+
+
+def _run_with_progress(args, duration, progress):
+    cmd = [mt.ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+           "-progress", "pipe:1", "-nostats", *args]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    stderr_chunks = []
+    stderr_thread = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+    stderr_thread.start()
+    for line in proc.stdout:
+        if progress and line.startswith("out_time_us=") and duration:
+            try:
+                progress(min(1.0, int(line.split("=", 1)[1]) / 1e6 / duration))
+            except ValueError:
+                pass
+    proc.wait()
+    stderr_thread.join()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {''.join(stderr_chunks).strip()[-2000:]}")
+
+
+def render(source_path, spans, output_path, duration, progress=None, video_args=None):
+    """
+    Burn the spans into ``source_path`` with a single ffmpeg process.
+
+    No frames pass through Python. ``progress(fraction)`` is called as ffmpeg
+    reports its position. Returns a stats dict.
+    """
+    started = time.perf_counter()
+    work_dir = ws.get_workspace().make_job_dir(prefix="ffmpeg_engine_")
+    try:
+        concat_path, filter_graph = build_filter_graph(spans, work_dir)
+        args = ["-i", source_path]
+        if concat_path is not None:
+            args += ["-f", "concat", "-safe", "0", "-i", concat_path]
+        # The graph is a single filter, so it goes on the command line
+        args += ["-filter_complex", filter_graph, "-map", "[vout]", "-map", "0:a?",
+                 *(video_args or ["-c:v", "libx264"])]
+        try:
+            _run_with_progress([*args, "-c:a", "copy", output_path], duration, progress)
+        except RuntimeError:
+            _run_with_progress([*args, "-c:a", "aac", output_path], duration, progress)
+    finally:
+        ws.get_workspace().remove_job_dir(work_dir)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "layers": len({_canvas_key(span) for span in spans if not span.passthrough}),
+        "elapsed_seconds": elapsed,
+        "realtime_factor": duration / elapsed,
+    }
@@ -0,0 +1,83 @@
+import os
+import threading
+import hashlib
+import utility_functions as uf
+import workspace as ws
+
+# ==============================
+# Font Registry
+# ==============================
+FONTS_DIR = os.path.join(os.path.dirname(__file__), "fonts")
+
+_families_by_digest = {}
+_families_by_path = {}
+_lock = threading.RLock()
+
+
+def bundled_fonts():
+    """Return {font name: path} for the .ttf files shipped in fonts/."""
+    fonts = {}
+    if os.path.exists(FONTS_DIR):
+        font_files = sorted(f for f in os.listdir(FONTS_DIR) if f.lower().endswith((".ttf",)))
+        fonts = {os.path.splitext(f)[0]: os.path.join(FONTS_DIR, f).replace("\\", "/") for f in font_files}
+    return fonts
+
+
+def register_font(font_path):
+    """
+    Register a font file with Qt once per process and return its family name.
+
+    Files are deduplicated by content hash, so the same TTF under two paths
+    is only added to QFontDatabase once. Returns None if Qt rejects the file.
+    """
+    if not font_path:
+        return None
+
+    from PySide6.QtGui import QFontDatabase
+
+    with _lock:
+        if font_path in _families_by_path:
+            return _families_by_path[font_path]
+
+        digest = uf.file_digest(font_path)
+        if digest in _families_by_digest:
+            family = _families_by_digest[digest]
+        else:
+            family = None
+            font_id = QFontDatabase.addApplicationFont(font_path)
+            if font_id != -1:
+                families = QFontDatabase.applicationFontFamilies(font_id)
+                if families:
+                    family = families[0]
+            if digest is not None:
+                _families_by_digest[digest] = family
+
+        _families_by_path[font_path] = family
+        return family
+
+
+def store_uploaded_font(uploaded_file):
+    """
+    Persist an uploaded font under a content-addressed name and return its path.
+
+    Re-uploads and Streamlit reruns of the same font reuse the existing file
+    instead of writing a new temporary copy each time.
+    """
+    data = uploaded_file.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+    workspace = ws.get_workspace()
+    font_path = os.path.join(workspace.area_dir("fonts"), f"{digest}.ttf")
+    workspace.touch(font_path)
+
+    with _lock:
+        if not os.path.exists(font_path):
+            tmp_path = f"{font_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, font_path)
+    return font_path
+
+
+def preload_bundled_fonts():
+    """Register every bundled font with Qt; cheap no-op after the first call."""
+    return {name: register_font(path) for name, path in bundled_fonts().items()}
@@ -1,10 +1,29 @@
+import importlib
 import os
-from PySide6.QtGui import QFont, QFontDatabase, QImage, QPainter, QColor,QPainterPath
-from PySide6.QtCore import Qt, QRectF
-import tempfile
-os.environ["QT_QPA_PLATFORM"] = "offscreen"
 
-def create_image_qt_text_bg(
+# ==============================
+# Text Rendering Backends
+# ==============================
+# Select with the TEXT_BACKEND environment variable ("qt" or "pillow").
+BACKENDS = {
+    "qt": "qt_text_backend",
+    "pillow": "pillow_text_backend",
+}
+TEXT_BACKEND = os.environ.get("TEXT_BACKEND", "qt").strip().lower()
+if TEXT_BACKEND not in BACKENDS:
+    TEXT_BACKEND = "qt"
+# Rounded corners of the text background box, in pixels
+CORNER_RADIUS = 7.5
+
+def get_backend(name=None):
+    """Import (lazily) and return the backend module for ``name``."""
+    return importlib.import_module(BACKENDS[name or TEXT_BACKEND])
+
+def warm_up(name=None):
+    """Prepare the selected backend (Qt app, font registration) once per process."""
+    get_backend(name).warm_up()
+
+def render_text_rgba(
     text,
     font_path=None,
     font_family="Arial",
@@ -13,52 +32,22 @@ def create_image_qt_text_bg(
     bg_color=None,          # RGB tuple
     bg_opacity=0.5,         # 0.0 to 1.0
     padding=20,
-    corner_radius=7.5
+    corner_radius=CORNER_RADIUS,
+    backend=None
 ):
-    # Register custom font
-    if font_path:
-        font_id = QFontDatabase.addApplicationFont(font_path)
-        families = QFontDatabase.applicationFontFamilies(font_id)
-        if families:
-            font_family = families[0]
-
-    font = QFont(font_family, font_size)
-
-    # Temporary image to measure text size
-    temp_img = QImage(1, 1, QImage.Format_ARGB32)
-    painter = QPainter(temp_img)
-    painter.setFont(font)
-    text_rect = painter.boundingRect(0, 0, 1000, 1000, Qt.AlignLeft | Qt.TextWordWrap, text)
-    painter.end()
-
-    # Final image size includes padding
-    img_width = text_rect.width() + padding * 2
-    img_height = text_rect.height() + padding * 2
-
-    img = QImage(img_width, img_height, QImage.Format_ARGB32)
-    img.fill(Qt.transparent)
-
-    painter = QPainter(img)
-    painter.setFont(font)
-
-    # Draw rounded background rectangle with alpha
-    if bg_color:
-        r, g, b = bg_color
-        alpha = int(bg_opacity * 255)  # Convert to 0–255
-        bg_rect = QRectF(padding, padding, text_rect.width(), text_rect.height())
-        path = QPainterPath()
-        path.addRoundedRect(bg_rect, corner_radius, corner_radius)
-        painter.fillPath(path, QColor(r, g, b, alpha))
-
-    # Draw centered text
-    painter.setPen(QColor(*text_color))
-    painter.drawText(QRectF(padding, padding, text_rect.width(), text_rect.height()),
-                     text, Qt.AlignCenter | Qt.TextWordWrap)
-
-    painter.end()
-
-    # Save to temp file
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-    img.save(temp_file.name)
-    temp_file.close()
-    return temp_file.name
+    """Render text with the configured backend → ``(rgba, (width, height))``."""
+    return get_backend(backend).render_text_rgba(
+        text,
+        font_path=font_path,
+        font_family=font_family,
+        font_size=font_size,
+        text_color=text_color,
+        bg_color=bg_color,
+        bg_opacity=bg_opacity,
+        padding=padding,
+        corner_radius=corner_radius
+    )
+
+def create_image_qt_text_bg(*args, **kwargs):
+    """Legacy PNG-file API, always rendered by the Qt backend."""
+    return get_backend("qt").create_image_qt_text_bg(*args, **kwargs)
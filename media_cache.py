@@ -0,0 +1,75 @@
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+import streamlit as st
+import utility_functions as uf
+import workspace as ws
+
+# ==============================
+# Upload & Session Media Cache
+# ==============================
+COPY_CHUNK_BYTES = 8 * 1024 * 1024
+
+_paths_by_file_id = {}
+_digests_by_path = {}
+_lock = threading.Lock()
+
+
+def _content_digest(uploaded_file):
+    h = hashlib.sha256()
+    uploaded_file.seek(0)
+    for chunk in iter(lambda: uploaded_file.read(COPY_CHUNK_BYTES), b""):
+        h.update(chunk)
+    uploaded_file.seek(0)
+    return h.hexdigest()
+
+
+def store_upload(uploaded_file, suffix=".mp4"):
+    """
+    Write an upload to disk once and return its path.
+
+    Keyed by the upload's file_id (and then its content hash), so Streamlit
+    reruns and re-uploads of the same file reuse the existing copy instead of
+    writing a new one. The copy is streamed in chunks.
+    """
+    file_id = getattr(uploaded_file, "file_id", None)
+    with _lock:
+        path = _paths_by_file_id.get(file_id)
+    workspace = ws.get_workspace()
+    if path and os.path.exists(path):
+        workspace.touch(path)
+        return path
+
+    digest = _content_digest(uploaded_file)
+    path = os.path.join(workspace.area_dir("uploads"), f"{digest}{suffix}")
+    workspace.touch(path)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        uploaded_file.seek(0)
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(uploaded_file, f, COPY_CHUNK_BYTES)
+        os.replace(tmp_path, path)
+        uploaded_file.seek(0)
+        workspace.enforce_quota()
+
+    with _lock:
+        if file_id is not None:
+            _paths_by_file_id[file_id] = path
+        _digests_by_path[path] = digest
+    return path
+
+
+def content_key(path):
+    """sha256 of a stored upload (known from the copy, so no re-read)."""
+    with _lock:
+        digest = _digests_by_path.get(path)
+    return digest or uf.file_digest(path)
+
+
+def session_owner():
+    """A unique, stable id for this browser session (pooled readers, workspace dirs)."""
+    if "media_owner" not in st.session_state:
+        st.session_state.media_owner = uuid.uuid4().hex
+    return st.session_state.media_owner
@@ -0,0 +1,122 @@
+import os
+import re
+import subprocess
+import threading
+import media_tools as mt
+import utility_functions as uf
+
+# ==============================
+# Cached Media Metadata
+# ==============================
+_info = {}
+_info_lock = threading.Lock()
+
+
+def _rate(value):
+    # ffprobe rates are fractions like "30000/1001"
+    try:
+        num, _, den = str(value).partition("/")
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _number(value, cast=float):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _probe_with_ffprobe(path):
+    data = mt.run_ffprobe([
+        "-show_entries",
+        "format=duration,bit_rate:"
+        "stream=codec_type,codec_name,pix_fmt,width,height,avg_frame_rate,r_frame_rate,nb_frames",
+        path
+    ])
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    fmt = data.get("format", {})
+    return {
+        "duration": _number(fmt.get("duration")),
+        "width": _number(video.get("width"), int),
+        "height": _number(video.get("height"), int),
+        "fps": _rate(video.get("avg_frame_rate")) or _rate(video.get("r_frame_rate")),
+        "n_frames": _number(video.get("nb_frames"), int),
+        "video_codec": video.get("codec_name"),
+        "pix_fmt": video.get("pix_fmt"),
+        "audio_codec": audio.get("codec_name") if audio else None,
+        "bit_rate": _number(fmt.get("bit_rate"), int),
+    }
+
+
+def _probe_with_ffmpeg(path):
+    # Header-only parse of `ffmpeg -i`, for installs that ship ffmpeg without ffprobe
+    proc = subprocess.run([mt.ffmpeg_binary(), "-hide_banner", "-nostdin", "-i", path],
+                          capture_output=True, text=True)
+    err = proc.stderr
+    info = dict.fromkeys(["duration", "width", "height", "fps", "n_frames", "video_codec",
+                          "pix_fmt", "audio_codec", "bit_rate"])
+    match = re.search(r"Duration: (\d+):(\d+):([\d.]+)", err)
+    if match:
+        h, m, s = match.groups()
+        info["duration"] = int(h) * 3600 + int(m) * 60 + float(s)
+    match = re.search(r"bitrate: (\d+) kb/s", err)
+    if match:
+        info["bit_rate"] = int(match.group(1)) * 1000
+    match = re.search(r"Stream #\S+.*?: Video: (\w+)[^,]*, (\w+)[^,]*.*?, (\d+)x(\d+)", err)
+    if match:
+        info["video_codec"], info["pix_fmt"] = match.group(1), match.group(2)
+        info["width"], info["height"] = int(match.group(3)), int(match.group(4))
+    match = re.search(r", ([\d.]+) fps", err)
+    if match:
+        info["fps"] = float(match.group(1))
+    match = re.search(r"Stream #\S+.*?: Audio: (\w+)", err)
+    if match:
+        info["audio_codec"] = match.group(1)
+    # Audio-only files still parse (width stays None); only unreadable input raises
+    if info["duration"] is None and info["width"] is None:
+        raise RuntimeError(f"Could not read media info: {err.strip()[-500:]}")
+    return info
+
+
+def _count_keyframes(key, path):
+    try:
+        count = len(mt.probe_keyframes(path))
+    except RuntimeError:
+        count = None
+    with _info_lock:
+        if key in _info:
+            _info[key]["keyframes"] = count
+            _info[key]["keyframes_status"] = "done" if count is not None else "failed"
+
+
+def probe_media(path, content_key=None):
+    """
+    Container and stream metadata for ``path`` without opening a decoder.
+
+    Results are cached per content hash (``content_key``, defaulting to the
+    file's sha256), so repeated calls return immediately. The keyframe count
+    needs a packet scan, so it is filled in by a background thread; until then
+    ``keyframes`` is None and ``keyframes_status`` is "counting".
+    """
+    key = content_key or uf.file_digest(path)
+    with _info_lock:
+        if key in _info:
+            return dict(_info[key])
+
+    info = _probe_with_ffprobe(path) if mt.ffprobe_binary() else _probe_with_ffmpeg(path)
+    if info["n_frames"] is None and info["duration"] and info["fps"]:
+        info["n_frames"] = int(info["duration"] * info["fps"])
+    info["size_bytes"] = os.path.getsize(path)
+    info["keyframes"] = None
+    info["keyframes_status"] = "counting"
+
+    with _info_lock:
+        if key in _info:
+            return dict(_info[key])
+        _info[key] = info
+    threading.Thread(target=_count_keyframes, args=(key, path), name="keyframe-count", daemon=True).start()
+    return dict(info)
@@ -0,0 +1,118 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+
+# ==============================
+# ffmpeg / ffprobe helpers
+# ==============================
+def ffmpeg_binary():
+    """ffmpeg executable: $FFMPEG_BINARY, else the one moviepy uses."""
+    if os.environ.get("FFMPEG_BINARY"):
+        return os.environ["FFMPEG_BINARY"]
+    try:
+        from moviepy.config import FFMPEG_BINARY
+        return FFMPEG_BINARY
+    except Exception:
+        return shutil.which("ffmpeg") or "ffmpeg"
+
+def ffprobe_binary():
+    """ffprobe executable: $FFPROBE_BINARY, PATH, or next to ffmpeg. None if missing."""
+    if os.environ.get("FFPROBE_BINARY"):
+        return os.environ["FFPROBE_BINARY"]
+    found = shutil.which("ffprobe")
+    if found:
+        return found
+    sibling = os.path.join(os.path.dirname(ffmpeg_binary()), "ffprobe")
+    return sibling if os.path.exists(sibling) else None
+
+def run_ffmpeg(args):
+    """Run ffmpeg quietly; raise RuntimeError with the tail of stderr on failure."""
+    cmd = [ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-nostdin", "-y", *args]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {proc.stderr.strip()[-2000:]}")
+    return proc
+
+def run_ffprobe(args):
+    """Run ffprobe with JSON output and return the parsed result."""
+    ffprobe = ffprobe_binary()
+    if ffprobe is None:
+        raise RuntimeError("ffprobe is not available")
+    cmd = [ffprobe, "-v", "error", "-of", "json", *args]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {proc.stderr.strip()[-2000:]}")
+    return json.loads(proc.stdout or "{}")
+
+def probe_video_stream(path):
+    """Codec, profile, level, pixel format, frame rates, time base, size and SAR of the first video stream."""
+    info = run_ffprobe([
+        "-select_streams", "v:0",
+        "-show_entries", "stream=codec_name,profile,level,pix_fmt,time_base,width,height,start_time,"
+                         "r_frame_rate,avg_frame_rate,sample_aspect_ratio",
+        path
+    ])
+    streams = info.get("streams") or [{}]
+    return streams[0]
+
+def _keyframes_via_ffmpeg(path):
+    # Decodes keyframes only; used when ffprobe isn't installed (imageio-ffmpeg ships ffmpeg alone)
+    cmd = [ffmpeg_binary(), "-hide_banner", "-nostdin", "-skip_frame", "nokey", "-i", path,
+           "-map", "0:v:0", "-vf", "showinfo", "-f", "null", "-"]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {proc.stderr.strip()[-2000:]}")
+    times = [float(t) for t in re.findall(r"pts_time:\s*([-\d.]+)", proc.stderr)]
+    if not times:
+        return []
+    origin = min(times)
+    return sorted(t - origin for t in times)
+
+def probe_audio_codec(path):
+    """Codec name of the first audio stream, or None if there is no audio."""
+    if ffprobe_binary() is None:
+        proc = subprocess.run([ffmpeg_binary(), "-hide_banner", "-nostdin", "-i", path],
+                              capture_output=True, text=True)
+        match = re.search(r"Stream #\S+.*?: Audio: (\w+)", proc.stderr)
+        return match.group(1) if match else None
+    info = run_ffprobe(["-select_streams", "a:0", "-show_entries", "stream=codec_name", path])
+    streams = info.get("streams") or []
+    return streams[0].get("codec_name") if streams else None
+
+def probe_keyframes(path):
+    """Keyframe timestamps (seconds from the start of the video stream), sorted."""
+    if ffprobe_binary() is None:
+        return _keyframes_via_ffmpeg(path)
+    info = run_ffprobe([
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags",
+        path
+    ])
+    times = []
+    for packet in info.get("packets", []):
+        if "K" in packet.get("flags", "") and packet.get("pts_time") not in (None, "N/A"):
+            times.append(float(packet["pts_time"]))
+    if not times:
+        return []
+    origin = float(probe_video_stream(path).get("start_time") or 0.0)
+    return sorted(max(0.0, t - origin) for t in times)
+
+def concat_copy(segment_paths, output_path, list_path):
+    """Join same-codec segments losslessly with the concat demuxer."""
+    with open(list_path, "w") as f:
+        for path in segment_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    run_ffmpeg(["-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_path])
+    return output_path
+
+def mux_source_audio(video_path, source_path, output_path):
+    """Combine a rendered video-only file with the source's audio (copied when possible)."""
+    base = ["-i", video_path, "-i", source_path, "-map", "0:v:0", "-map", "1:a?", "-c:v", "copy"]
+    try:
+        run_ffmpeg([*base, "-c:a", "copy", output_path])
+    except RuntimeError:
+        run_ffmpeg([*base, "-c:a", "aac", output_path])
+    return output_path
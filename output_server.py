@@ -0,0 +1,62 @@
+import os
+import secrets
+import shutil
+import threading
+from urllib.parse import quote
+import streamlit as st
+
+# ==============================
+# Output Serving
+# ==============================
+# Finished renders are hard-linked into static/outputs/ and served by
+# Streamlit's static file serving (server.enableStaticServing), which streams
+# them from disk with range support, so st.video and downloads never load the
+# whole file into the Streamlit process.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+OUTPUTS_DIR = os.path.join(STATIC_DIR, "outputs")
+STATIC_URL = "/app/static/outputs"
+# Streamlit answers 404 for static files larger than this
+STATIC_MAX_BYTES = 200 * 1024 * 1024
+
+_lock = threading.Lock()
+
+
+def static_serving_enabled():
+    return bool(st.get_option("server.enableStaticServing"))
+
+
+def _prune():
+    # A link count of 1 means the workspace has evicted or removed the original
+    if not os.path.isdir(OUTPUTS_DIR):
+        return
+    for token in os.listdir(OUTPUTS_DIR):
+        token_dir = os.path.join(OUTPUTS_DIR, token)
+        names = os.listdir(token_dir) if os.path.isdir(token_dir) else []
+        try:
+            stale = not names or all(os.stat(os.path.join(token_dir, n)).st_nlink < 2 for n in names)
+        except OSError:
+            stale = True
+        if stale:
+            shutil.rmtree(token_dir, ignore_errors=True)
+
+
+def publish(path, filename=None):
+    """
+    Make ``path`` available under Streamlit's static route and return its
+    URL. Returns None when static serving is off, the file is too large for
+    it, or it can't be hard-linked into static/ (e.g. another filesystem).
+    """
+    if not static_serving_enabled() or os.path.getsize(path) > STATIC_MAX_BYTES:
+        return None
+    filename = filename or os.path.basename(path)
+    token = secrets.token_urlsafe(16)
+    token_dir = os.path.join(OUTPUTS_DIR, token)
+    with _lock:
+        _prune()
+        os.makedirs(token_dir, exist_ok=True)
+        try:
+            os.link(path, os.path.join(token_dir, filename))
+        except OSError:
+            shutil.rmtree(token_dir, ignore_errors=True)
+            return None
+    return f"{STATIC_URL}/{token}/{quote(filename)}"
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import image_generator as ig
+import utility_functions as uf
+
+# ==============================
+# Overlay Bitmap Cache
+# ==============================
+DEFAULT_MAX_BYTES = int(os.environ.get("OVERLAY_CACHE_MAX_MB", "256")) * 1024 * 1024
+DEFAULT_DISK_DIR = os.environ.get("OVERLAY_CACHE_DIR") or None
+
+
+class OverlayCache:
+    """
+    Content-addressed cache of rendered overlay bitmaps.
+
+    Entries are keyed on everything that affects the pixels (backend, text,
+    font file hash, size, colors, opacity, padding, corner radius). A bounded
+    in-memory LRU tier sits in front of an optional on-disk tier of ``.npy``
+    files.
+    Cached arrays are read-only; callers must copy before mutating.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, disk_dir=DEFAULT_DISK_DIR):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -----------------------------
+    # Keys
+    # -----------------------------
+    @staticmethod
+    def make_key(text, font_path, font_size, text_color, bg_color, bg_opacity, padding, corner_radius):
+        parts = [
+            ig.TEXT_BACKEND,
+            str(text),
+            uf.file_digest(font_path),
+            int(font_size),
+            list(text_color),
+            list(bg_color) if bg_color else None,
+            round(float(bg_opacity), 4),
+            int(padding),
+            float(corner_radius),
+        ]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    # -----------------------------
+    # Lookup / Store
+    # -----------------------------
+    def get(self, key):
+        with self._lock:
+            rgba = self._entries.get(key)
+            if rgba is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return rgba
+
+        rgba = self._load_from_disk(key)
+        if rgba is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._store_in_memory(key, rgba)
+            return rgba
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, rgba):
+        rgba.flags.writeable = False
+        self._store_in_memory(key, rgba)
+        self._save_to_disk(key, rgba)
+        return rgba
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+    def _store_in_memory(self, key, rgba):
+        size = rgba.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = rgba
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.npy")
+
+    def _load_from_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            rgba = np.load(path)
+        except Exception:
+            return None
+        rgba.flags.writeable = False
+        return rgba
+
+    def _save_to_disk(self, key, rgba):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, rgba)
+            os.replace(tmp_path, path)
+        except Exception:
+            uf.remove_temp_files(tmp_path)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_overlay_cache():
+    """Process-wide overlay cache shared by all sessions."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = OverlayCache()
+        return _cache
@@ -0,0 +1,344 @@
+from bisect import bisect_right
+import os
+import time
+import numpy as np
+import position_helpers as ph
+
+# ==============================
+# Overlay Layers
+# ==============================
+# Shortest span an overlay is shown for (matches the old moviepy duration floor)
+MIN_DURATION = 0.01
+# Overlays closer than this (in pixels) are flattened together; farther ones
+# stay separate so the blend never covers the empty space between them
+MERGE_GAP = int(os.environ.get("OVERLAY_MERGE_GAP", "32"))
+
+
+class OverlayLayer:
+    """
+    Compact, pre-positioned overlay ready for blending.
+
+    Holds premultiplied RGB and a uint8 alpha (4 bytes per pixel in total),
+    computed once per overlay, instead of a float64 moviepy mask clip.
+    """
+
+    __slots__ = ("premul_rgb", "alpha", "x", "y", "start", "end")
+
+    def __init__(self, premul_rgb, alpha, x, y, start, end):
+        self.premul_rgb = premul_rgb
+        self.alpha = alpha
+        self.x = x
+        self.y = y
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def from_rgba(cls, rgba, x, y, start, end):
+        alpha = np.ascontiguousarray(rgba[:, :, 3])
+        premul = (rgba[:, :, :3].astype(np.uint16) * alpha[:, :, None] + 127) // 255
+        return cls(premul.astype(np.uint8), alpha, x, y, start, end)
+
+    @property
+    def w(self):
+        return self.alpha.shape[1]
+
+    @property
+    def h(self):
+        return self.alpha.shape[0]
+
+
+def overlay_span(overlay):
+    """(start, end) in seconds for an overlay entry (timed in whole milliseconds)."""
+    start = overlay["start_ms"] / 1000
+    end = start + max(MIN_DURATION, (overlay["end_ms"] - overlay["start_ms"]) / 1000)
+    return start, end
+
+
+def build_layers(overlays, rendered, vid_w, vid_h):
+    """Turn overlay entries plus their rendered RGBA bitmaps into OverlayLayers."""
+    layers = []
+    for overlay, (rgba, (ov_w, ov_h)) in zip(overlays, rendered):
+        x, y = ph.resolve_position(
+            overlay["position"], vid_w, vid_h, ov_w, ov_h,
+            overlay.get("x_percent", 50), overlay.get("y_percent", 90)
+        )
+        start, end = overlay_span(overlay)
+        layers.append(OverlayLayer.from_rgba(rgba, x, y, start, end))
+    return layers
+
+
+# ==============================
+# Time Index
+# ==============================
+class OverlayIndex:
+    """
+    Sorted interval index over layer start/end boundaries.
+
+    A sweep over the boundaries records, for every elementary span between
+    two consecutive boundaries, the layers visible in it (in cue order).
+    ``active(t)`` is then a binary search: O(log N + k) per frame.
+    """
+
+    def __init__(self, layers):
+        self.layers = list(layers)
+        self.bounds = sorted({layer.start for layer in self.layers} | {layer.end for layer in self.layers})
+        self.spans = []
+
+        n = len(self.layers)
+        by_start = sorted(range(n), key=lambda i: self.layers[i].start)
+        by_end = sorted(range(n), key=lambda i: self.layers[i].end)
+        active = set()
+        si = ei = 0
+        for bound in self.bounds[:-1]:
+            while si < n and self.layers[by_start[si]].start <= bound:
+                active.add(by_start[si])
+                si += 1
+            while ei < n and self.layers[by_end[ei]].end <= bound:
+                active.discard(by_end[ei])
+                ei += 1
+            self.spans.append(tuple(self.layers[i] for i in sorted(active)))
+
+    def active(self, t):
+        """Layers visible at time ``t``, in cue order."""
+        i = bisect_right(self.bounds, t) - 1
+        if i < 0 or i >= len(self.spans):
+            return ()
+        return self.spans[i]
+
+
+# ==============================
+# Timeline Segmentation
+# ==============================
+class Span:
+    """Constant stretch of the timeline: its flattened layers, or passthrough."""
+
+    __slots__ = ("start", "end", "layers")
+
+    def __init__(self, start, end, layers=()):
+        self.start = start
+        self.end = end
+        self.layers = layers
+
+    @property
+    def passthrough(self):
+        return not self.layers
+
+    def __repr__(self):
+        kind = ", ".join(f"{layer.w}x{layer.h}@{layer.x},{layer.y}" for layer in self.layers) or "passthrough"
+        return f"Span({self.start:.3f}-{self.end:.3f}, {kind})"
+
+
+def _near(a, b, gap):
+    return (a.x - gap < b.x + b.w and b.x - gap < a.x + a.w
+            and a.y - gap < b.y + b.h and b.y - gap < a.y + a.h)
+
+
+def cluster_layers(layers, gap=MERGE_GAP):
+    """
+    Group layers whose rectangles overlap or lie within ``gap`` pixels of each
+    other (transitively). Each group keeps cue order; separate groups don't
+    touch, so the order they are blended in doesn't matter.
+    """
+    groups = []
+    for layer in layers:
+        near = [group for group in groups if any(_near(layer, other, gap) for other in group)]
+        merged = [other for group in near for other in group] + [layer]
+        merged.sort(key=layers.index)
+        groups = [group for group in groups if group not in near] + [merged]
+    groups.sort(key=lambda group: layers.index(group[0]))
+    return groups
+
+
+def flatten_layers(layers):
+    """Pre-composite layers (in cue order) into one premultiplied layer over their union box."""
+    if len(layers) == 1:
+        return layers[0]
+
+    x0 = min(layer.x for layer in layers)
+    y0 = min(layer.y for layer in layers)
+    x1 = max(layer.x + layer.w for layer in layers)
+    y1 = max(layer.y + layer.h for layer in layers)
+    rgb = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint16)
+    alpha = np.zeros((y1 - y0, x1 - x0, 1), dtype=np.uint16)
+
+    for layer in layers:
+        ys = slice(layer.y - y0, layer.y - y0 + layer.h)
+        xs = slice(layer.x - x0, layer.x - x0 + layer.w)
+        src_a = layer.alpha[:, :, None].astype(np.uint16)
+        inv = 255 - src_a
+        rgb[ys, xs] = layer.premul_rgb + (rgb[ys, xs] * inv + 127) // 255
+        alpha[ys, xs] = src_a + (alpha[ys, xs] * inv + 127) // 255
+
+    return OverlayLayer(
+        np.minimum(rgb, 255).astype(np.uint8),
+        np.minimum(alpha[:, :, 0], 255).astype(np.uint8),
+        x0, y0, layers[0].start, layers[0].end
+    )
+
+
+def segment_timeline(layers, duration=None):
+    """
+    Split the timeline at every cue boundary into constant spans.
+
+    Each span carries the visible overlays pre-flattened into one layer per
+    cluster of nearby overlays (see ``cluster_layers``), or is marked
+    passthrough when no overlay is visible. With ``duration`` the spans cover
+    ``[0, duration)`` end to end.
+    """
+    index = OverlayIndex(layers)
+    flattened = {}
+    spans = []
+    for start, end, active in zip(index.bounds, index.bounds[1:], index.spans):
+        if not active:
+            spans.append(Span(start, end))
+            continue
+        span_layers = []
+        for group in cluster_layers(list(active)):
+            # Keyed by the group, so an unchanged cluster is shared between spans
+            key = tuple(id(layer) for layer in group)
+            if key not in flattened:
+                flattened[key] = flatten_layers(group)
+            span_layers.append(flattened[key])
+        spans.append(Span(start, end, tuple(span_layers)))
+
+    if duration is not None:
+        spans = [span for span in spans if span.start < duration]
+        if spans:
+            spans[-1].end = min(spans[-1].end, duration)
+        head = spans[0].start if spans else duration
+        if head > 0:
+            spans.insert(0, Span(0.0, head))
+        tail = spans[-1].end if spans else 0.0
+        if tail < duration:
+            spans.append(Span(tail, duration))
+
+    # Merge neighbouring passthrough spans
+    merged = []
+    for span in spans:
+        if merged and span.passthrough and merged[-1].passthrough:
+            merged[-1].end = span.end
+        else:
+            merged.append(span)
+    return merged
+
+
+class SpanTimeline:
+    """Binary-searchable list of spans → the flattened layers to blend at ``t``."""
+
+    def __init__(self, spans):
+        self.spans = spans
+        self.starts = [span.start for span in spans]
+
+    def span_at(self, t):
+        i = bisect_right(self.starts, t) - 1
+        if i < 0 or t >= self.spans[i].end:
+            return None
+        return self.spans[i]
+
+    def layers_at(self, t):
+        span = self.span_at(t)
+        return span.layers if span is not None else ()
+
+
+# ==============================
+# Blending
+# ==============================
+def _clip_rect(layer, frame_w, frame_h):
+    """Intersection of a layer with the frame as (frame slices, layer slices) or None."""
+    x0, y0 = max(layer.x, 0), max(layer.y, 0)
+    x1, y1 = min(layer.x + layer.w, frame_w), min(layer.y + layer.h, frame_h)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    lx0, ly0 = x0 - layer.x, y0 - layer.y
+    return (
+        (slice(y0, y1), slice(x0, x1)),
+        (slice(ly0, ly0 + (y1 - y0)), slice(lx0, lx0 + (x1 - x0))),
+    )
+
+
+class BlendKernel:
+    """
+    In-place premultiplied "over" blend restricted to each layer's rectangle.
+
+    ``dst = premul + dst * (255 - a) / 255`` in uint16 integer math, using
+    scratch buffers that are grown to the largest overlay seen and reused,
+    so no per-frame temporaries are allocated.
+    """
+
+    def __init__(self):
+        self._acc = np.empty((0, 0, 3), dtype=np.uint16)
+        self._tmp = np.empty((0, 0, 3), dtype=np.uint16)
+        self._inv = np.empty((0, 0, 1), dtype=np.uint16)
+
+    def _scratch(self, h, w):
+        if h > self._acc.shape[0] or w > self._acc.shape[1]:
+            h_max, w_max = max(h, self._acc.shape[0]), max(w, self._acc.shape[1])
+            self._acc = np.empty((h_max, w_max, 3), dtype=np.uint16)
+            self._tmp = np.empty((h_max, w_max, 3), dtype=np.uint16)
+            self._inv = np.empty((h_max, w_max, 1), dtype=np.uint16)
+        return self._acc[:h, :w], self._tmp[:h, :w], self._inv[:h, :w]
+
+    def blend(self, frame, layer):
+        rect = _clip_rect(layer, frame.shape[1], frame.shape[0])
+        if rect is None:
+            return frame
+        (fy, fx), (ly, lx) = rect
+        region = frame[fy, fx]
+        acc, tmp, inv = self._scratch(region.shape[0], region.shape[1])
+
+        np.subtract(255, layer.alpha[ly, lx, None], out=inv)
+        np.multiply(region, inv, out=acc)
+        # Exact round(x / 255) for x in [0, 255 * 255]: (x + 128 + ((x + 128) >> 8)) >> 8
+        np.add(acc, 128, out=acc)
+        np.right_shift(acc, 8, out=tmp)
+        np.add(acc, tmp, out=acc)
+        np.right_shift(acc, 8, out=acc)
+        np.add(acc, layer.premul_rgb[ly, lx], out=acc)
+        np.minimum(acc, 255, out=acc)
+        np.copyto(region, acc, casting="unsafe")
+        return frame
+
+
+class OverlayCompositor:
+    """Per-frame compositor: pre-flattened layers per span, dirty-rectangle blending."""
+
+    def __init__(self, layers, duration=None):
+        self.timeline = SpanTimeline(segment_timeline(layers, duration))
+        self.kernel = BlendKernel()
+        self.frames = 0
+        self.blended_frames = 0
+        self.blend_seconds = 0.0
+        self.max_blend_seconds = 0.0
+
+    def composite_frame(self, frame, t):
+        """Blend the layers active at ``t`` into ``frame`` (copied only if read-only)."""
+        self.frames += 1
+        layers = self.timeline.layers_at(t)
+        if not layers:
+            return frame
+
+        started = time.perf_counter()
+        if not frame.flags.writeable:
+            frame = frame.copy()
+        for layer in layers:
+            self.kernel.blend(frame, layer)
+        elapsed = time.perf_counter() - started
+
+        self.blended_frames += 1
+        self.blend_seconds += elapsed
+        self.max_blend_seconds = max(self.max_blend_seconds, elapsed)
+        return frame
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "blended_frames": self.blended_frames,
+            "blend_seconds": self.blend_seconds,
+            "mean_blend_ms": 1e3 * self.blend_seconds / self.blended_frames if self.blended_frames else 0.0,
+            "max_blend_ms": 1e3 * self.max_blend_seconds,
+        }
+
+
+def composite_clip(clip, compositor):
+    """Return ``clip`` with the compositor's layers burned in (audio is kept)."""
+    return clip.transform(lambda get_frame, t: compositor.composite_frame(get_frame(t), t))
@@ -1,26 +1,36 @@
 from datetime import datetime
 import os
-import tempfile
 import time
-import streamlit as st
-import image_generator as ig
 import numpy as np
-from PIL import Image
-from moviepy import ImageClip, CompositeVideoClip
-import position_helpers as ph
+import pandas as pd
+import streamlit as st
+import chunked_render as cr
+import encoder_profiles as ep
+import ffmpeg_engine as fe
+import font_registry as fr
+import media_cache as mc
+import media_probe as mp
+import media_tools as mt
+import overlay_cache as oc
+import overlay_compositor as comp
+import output_server as osrv
+import parallel_raster as pr
+import preview as pv
+import proxy_media as pm
+import reader_pool as rpool
+import render_pipeline as rp
+import smart_render as sr
+import soft_subtitles as ss
 import streamlit_logger as sl
 import utility_functions as uf
+import workspace as ws
 
 # -----------------------------
 # Add Overlays setting data
 # -----------------------------
 
 def overlay_setting_fields(key_suffix):
-    FONTS_DIR = os.path.join(os.path.dirname(__file__), "fonts")
-    fonts = {}
-    if os.path.exists(FONTS_DIR):
-        font_files = [f for f in os.listdir(FONTS_DIR) if f.lower().endswith((".ttf",))]
-        fonts = {os.path.splitext(f)[0]: os.path.join(FONTS_DIR, f) for f in font_files}
+    fonts = fr.bundled_fonts()
 
     # Option selection
     font_option = st.radio(
@@ -40,7 +50,7 @@ def overlay_setting_fields(key_suffix):
                 list(fonts.keys()), 
                 key=f"{key_suffix}_font_selectbox"
             )
-            font_path = fonts[selected_font].replace("\\", "/")
+            font_path = fonts[selected_font]
             font_name = selected_font
         else:
             st.warning("No fonts found in the fonts folder.")
@@ -52,10 +62,7 @@ def overlay_setting_fields(key_suffix):
             key=f"{key_suffix}_font_upload"
         )
         if uploaded_font_file is not None:
-            tmp_font = tempfile.NamedTemporaryFile(delete=False, suffix=".ttf")
-            tmp_font.write(uploaded_font_file.read())
-            tmp_font.close()
-            font_path = tmp_font.name
+            font_path = fr.store_uploaded_font(uploaded_font_file)
             font_name = os.path.splitext(uploaded_font_file.name)[0]
 
     # fallback
@@ -122,95 +129,289 @@ def overlay_setting_fields(key_suffix):
 # -----------------------------
 # Generate Final Video
 # -----------------------------
-def generate_finel_video(clip, key_suffix, target="overlays"):
+RENDER_ENGINES = ["moviepy", "pipelined", "chunked parallel", "ffmpeg filter graph"]
+OUTPUT_MODES = ["Burn-in text", "Soft subtitles"]
+# Outputs that can't be served statically are only previewed inline up to this size
+INLINE_MAX_BYTES = int(float(os.environ.get("OUTPUT_INLINE_MAX_MB", "200")) * 1024 * 1024)
+
+def show_output(output_path, output_filename, key_suffix):
+    """Preview the finished file and offer it for download."""
+    # Make room for the new output without evicting it
+    workspace = ws.get_workspace()
+    workspace.pin(output_path)
+    workspace.enforce_quota()
+    workspace.unpin(output_path)
+
+    st.success("✅ Video generated successfully!")
+
+    # Served from disk by Streamlit's static route, so the file never sits in memory
+    url = osrv.publish(output_path, output_filename)
+    if url is not None:
+        st.video(url)
+        st.link_button("📥 Download", url, help="Download Final Video")
+        return
+
+    size = os.path.getsize(output_path)
+    if size <= INLINE_MAX_BYTES:
+        st.video(output_path)
+    else:
+        st.info(f"The {size / 1e6:.0f} MB result is too large to preview here; download it instead.")
+    def read_output():
+        # Deferred: the file is only read when the button is clicked
+        with open(output_path, "rb") as f:
+            return f.read()
+
+    st.download_button(
+        "📥 Download", read_output, file_name=output_filename,
+        help="Download Final Video", key=f"dl_{key_suffix}", on_click="ignore"
+    )
+
+def generate_soft_subtitles(video_path, overlays, track_format, key_suffix):
+    """Mux the overlays as a selectable text track (stream copy, no re-encode)."""
+    ext, _, _ = ss.TRACK_FORMATS[track_format]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_filename = f"video_with_subtitles_{timestamp}{ext}"
+    output_path = ws.get_workspace().output_path(output_filename)
+
+    with st.spinner("Muxing subtitle track..."):
+        started = time.perf_counter()
+        try:
+            ss.mux_soft_subtitles(video_path, overlays, output_path, track_format)
+        except RuntimeError as e:
+            st.error(f"❌ Could not mux subtitles into this container: {e}")
+            return
+    st.caption(f"Subtitle track muxed in {time.perf_counter() - started:.1f}s")
+    show_output(output_path, output_filename, key_suffix)
+
+    sidecar, sidecar_ext = ss.sidecar_text(overlays, track_format)
+    st.download_button(
+        "📥 Download subtitles file", sidecar, file_name=f"subtitles_{timestamp}{sidecar_ext}",
+        help="Download the text track as a separate file", key=f"dl_subs_{key_suffix}"
+    )
+
+def generate_finel_video(video_path, key_suffix, target="overlays"):
     overlays = st.session_state.get(target, [])
-    
+
+    output_mode = st.radio(
+        "Output",
+        OUTPUT_MODES,
+        horizontal=True,
+        key=f"output_mode_{key_suffix}",
+        help="Soft subtitles add a selectable caption track without re-encoding the video"
+    )
+    engine = None
+    profile = None
+    smart_render = False
+    track_format = None
+    if output_mode == "Soft subtitles":
+        track_format = st.selectbox(
+            "Subtitle track",
+            list(ss.TRACK_FORMATS),
+            key=f"track_format_{key_suffix}"
+        )
+    else:
+        engine = st.radio(
+            "Render engine",
+            RENDER_ENGINES,
+            horizontal=True,
+            key=f"render_engine_{key_suffix}",
+            help="pipelined overlaps decode, compositing and encode on separate threads; "
+                 "chunked parallel renders keyframe-aligned chunks in separate processes; "
+                 "ffmpeg filter graph burns the text in without passing frames through Python"
+        )
+        profile = st.selectbox(
+            "Encoder profile",
+            list(ep.PROFILES),
+            index=list(ep.PROFILES).index(ep.DEFAULT_PROFILE) if ep.DEFAULT_PROFILE in ep.PROFILES else 0,
+            key=f"encoder_profile_{key_suffix}",
+            help="draft: fastest, lower quality · balanced: default · archive: slow, high quality. "
+                 "Compatible source audio is stream-copied."
+        )
+        if engine == "moviepy":
+            smart_render = st.checkbox(
+                "Smart render",
+                key=f"smart_render_{key_suffix}",
+                help="Re-encode only the parts of the video that carry text and stream-copy the rest"
+            )
     if st.button(
         "Generate Video",
         help="Generate the final video with all overlays applied",
         key=f"gen_video_{key_suffix}"
     ):
-        st.write("Processing video...")
-        text_clips = []
-
-        for overlay in overlays:
-            # Create RGBA text image
-            pil_img = ig.create_image_qt_text_bg(  
-                overlay["text"],
-                font_path=overlay["font_path"],
-                font_size=overlay["font_size"],
-                text_color=tuple(int(overlay["color"].lstrip("#")[i:i+2], 16) for i in (0,2,4)),
-                bg_color=overlay["bg_color"],
-                bg_opacity=overlay.get("bg_opacity", 0.5),
-                padding=overlay["bottom_padding"]
-            )
+        if output_mode == "Soft subtitles":
+            generate_soft_subtitles(video_path, overlays, track_format, key_suffix)
+            return
 
-            np_img = np.array(Image.open(pil_img))
-
-            # Split RGB and Alpha → build mask for transparency
-            if np_img.shape[-1] == 4:
-                rgb = np_img[:, :, :3]
-                alpha = np_img[:, :, 3] / 255.0
-                rgb_clip = ImageClip(rgb)
-                mask_clip = ImageClip(alpha, is_mask=True)
-                img_clip = rgb_clip.with_mask(mask_clip)
-            else:
-                img_clip = ImageClip(np_img)
-
-            # Determine position
-            position = overlay["position"]
-            if position == "Custom (percent)":
-                pil_img_obj = Image.open(pil_img)
-                ov_w, ov_h = pil_img_obj.size
-                x_percent = overlay.get("x_percent", 50) or 0
-                y_percent = overlay.get("y_percent", 90) or 0
-                x_px, y_px = ph.compute_custom_xy_percent(
-                    clip.w, clip.h, ov_w, ov_h, x_percent, y_percent
-                )
-                img_clip = img_clip.with_position((x_px, y_px))
-            else:
-                img_clip = img_clip.with_position(ph.PRESET_POSITIONS[position])
+        st.write("Processing video...")
 
-            # Timing
-            img_clip = (
-                img_clip.with_start(overlay["start"])
-                        .with_duration(max(0.01, overlay["end"] - overlay["start"]))
-            )
-            text_clips.append(img_clip)
+        # Draft renders use the low-res proxy; other profiles use the source
+        source_path = video_path
+        proxy = pm.get_proxy(video_path) if profile == "draft" else None
+        if proxy is not None:
+            source_path = proxy.path
+            overlays = pm.scale_overlays(overlays, proxy.scale)
+            st.caption(f"Draft render from {proxy.size[0]}x{proxy.size[1]} proxy")
+
+        # Every engine takes its metadata from the (cached) probe; only the
+        # moviepy engine reads frames through a reader of its own
+        info = source_info(video_path)
+        width, height = proxy.size if proxy is not None else (info["width"], info["height"])
+        fps, duration = info["fps"], info["duration"]
+        if engine != "moviepy" and not (fps and duration):
+            st.info("The video's frame rate or duration is unknown; rendering with moviepy.")
+            engine = "moviepy"
+
+        overlay_cache = oc.get_overlay_cache()
+
+        # Rasterize all cues up front (parallel for long subtitle files)
+        rendered = pr.rasterize_overlays(overlays, cache=overlay_cache)
+
+        # Compact premultiplied layers, positioned once
+        layers = comp.build_layers(overlays, rendered, width, height)
+
+        cache_stats = overlay_cache.stats()
+        st.caption(
+            f"Overlay cache: {cache_stats['hits'] + cache_stats['disk_hits']} hits, "
+            f"{cache_stats['misses']} misses, {cache_stats['bytes'] / 1e6:.1f} MB in memory"
+        )
 
         # Compose and export
-        final = CompositeVideoClip([clip, *text_clips])
+        compositor = comp.OverlayCompositor(layers, duration=duration)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_filename = f"video_with_text_{timestamp}.mp4"
-        output_path = os.path.join(tempfile.gettempdir(), output_filename)
+        output_path = ws.get_workspace().output_path(output_filename)
 
         try:
-            total_frames = int(final.fps * final.duration)
-        except Exception:
-            total_frames = None
-
-        logger = sl.StreamlitLogger(total_frames)
-        final.write_videofile(
-            output_path,
-            codec="libx264",
-            audio_codec="aac",
-            logger=logger
+            if engine == "moviepy":
+                render_with_moviepy(source_path, compositor, output_path, profile, smart_render)
+            else:
+                try:
+                    ENGINE_RENDERERS[engine](
+                        source_path, layers, compositor, output_path, (width, height), fps, duration, profile
+                    )
+                except RuntimeError as e:
+                    st.warning(f"The {engine} engine failed ({str(e)[:300]}); rendering with moviepy instead.")
+                    render_with_moviepy(source_path, compositor, output_path, profile, False)
+        except (RuntimeError, OSError) as e:
+            st.error(f"❌ Could not render the video: {str(e)[:500]}")
+            return
+
+        blend_stats = compositor.stats()
+        st.caption(
+            f"Compositing: {blend_stats['mean_blend_ms']:.2f} ms/frame mean, "
+            f"{blend_stats['max_blend_ms']:.2f} ms max over {blend_stats['blended_frames']} frames with text"
         )
+        show_output(output_path, output_filename, key_suffix)
 
-        st.success("✅ Video generated successfully!")
-        st.video(output_path)
+# -----------------------------
+# Render Engines
+# -----------------------------
+def render_with_ffmpeg(source_path, layers, compositor, output_path, size, fps, duration, profile):
+    """Burn the text in with one ffmpeg filter graph; no frames pass through Python."""
+    progress_bar = st.progress(0)
+    engine_stats = fe.render(
+        source_path, compositor.timeline.spans, output_path, duration,
+        progress=lambda fraction: progress_bar.progress(fraction),
+        video_args=ep.video_args(profile, size)
+    )
+    st.caption(
+        f"ffmpeg engine: {engine_stats['layers']} layers in {engine_stats['elapsed_seconds']:.1f}s "
+        f"({engine_stats['realtime_factor']:.1f}x realtime)"
+    )
 
-        with open(output_path, "rb") as f:
-            st.download_button(
-                "📥 Download", f, file_name=output_filename,
-                help="Download Final Video", key=f"dl_{key_suffix}"
-            )
+def render_pipelined(source_path, layers, compositor, output_path, size, fps, duration, profile):
+    """Decode, composite and encode on separate threads."""
+    progress_bar = st.progress(0)
+    total_frames = max(1, int(duration * fps))
+    pipeline = rp.RenderPipeline(
+        source_path, compositor, output_path, size[0], size[1], fps,
+        video_args=ep.video_args(profile, size), audio_args=ep.audio_args(profile, source_path)
+    )
+    pipeline_stats = pipeline.run(
+        progress=lambda stats: progress_bar.progress(min(stats["stages"][-1]["frames"] / total_frames, 1.0))
+    )
+    st.caption(
+        f"Pipeline bottleneck: {pipeline.bottleneck()} "
+        f"(peak queue depth {pipeline_stats['peak_queue_depth']})"
+    )
+    st.table(pipeline_stats["stages"])
+
+def render_chunked(source_path, layers, compositor, output_path, size, fps, duration, profile):
+    """Render keyframe-aligned chunks in separate processes and join them."""
+    progress_bar = st.progress(0)
+    chunk_stats = cr.chunked_render(
+        source_path, layers, output_path, size[0], size[1], fps, duration,
+        profile=profile,
+        progress=lambda done, total: progress_bar.progress(done / total)
+    )
+    st.caption(
+        f"Chunked render: {chunk_stats['chunks']} chunks on {chunk_stats['workers']} workers "
+        f"in {chunk_stats['elapsed_seconds']:.1f}s"
+    )
+
+ENGINE_RENDERERS = {
+    "pipelined": render_pipelined,
+    "chunked parallel": render_chunked,
+    "ffmpeg filter graph": render_with_ffmpeg,
+}
 
-        # Cleanup
+def render_with_moviepy(source_path, compositor, output_path, profile, smart_render=False):
+    """
+    Render through a private moviepy reader: smart render when asked for and
+    possible, otherwise the full video. Raises RuntimeError if the reader
+    pool is full.
+    """
+    pool = rpool.get_pool()
+    owner = mc.session_owner()
+    clip = pool.acquire(source_path, owner, exclusive=True)
+    try:
+        if smart_render and render_smart(clip, source_path, compositor, output_path, profile):
+            return
+        final = comp.composite_clip(clip, compositor)
         try:
-            uf.close_and_remove(final, *text_clips)
+            total_frames = int(final.fps * final.duration)
         except Exception:
-            pass
+            total_frames = None
+
+        logger = sl.StreamlitLogger(total_frames)
+        if ep.can_copy_audio(profile, source_path):
+            # Encode video only, then stream-copy the untouched source audio
+            video_only_path = f"{output_path}.video.mp4"
+            final.write_videofile(video_only_path, audio=False, logger=logger, **ep.moviepy_write_kwargs(profile, final.size))
+            mt.mux_source_audio(video_only_path, source_path, output_path)
+            uf.remove_temp_files(video_only_path)
+        else:
+            final.write_videofile(
+                output_path,
+                audio_codec="aac",
+                logger=logger,
+                **ep.moviepy_write_kwargs(profile, final.size)
+            )
+    finally:
+        pool.release(clip, owner)
+
+def render_smart(clip, source_path, compositor, output_path, profile):
+    """Re-encode only the GOPs with text; False (after saying why) if the full render is needed."""
+    stream, reason = sr.check_eligible(source_path)
+    if reason:
+        st.info(f"Smart render unavailable ({reason}); rendering the full video.")
+        return False
+    progress_bar = st.progress(0)
+    try:
+        smart_stats = sr.smart_render(
+            clip, source_path, compositor, output_path,
+            progress=lambda done, total: progress_bar.progress(done / total),
+            profile=profile, stream=stream
+        )
+    except RuntimeError as e:
+        st.info(f"Smart render failed ({str(e)[:200]}); rendering the full video.")
+        return False
+    st.caption(
+        f"Smart render: re-encoded {smart_stats['reencoded_seconds']:.1f}s "
+        f"({smart_stats['reencoded_fraction']:.0%}) in {smart_stats['reencoded_segments']} of "
+        f"{smart_stats['segments']} segments, {smart_stats['elapsed_seconds']:.1f}s total"
+    )
+    return True
 
 # -----------------------------
 # Delete overlays button 
@@ -228,30 +429,134 @@ def delete_text_file_overlays(i, key_suffix, target="overlays"):
 # -----------------------------
 # Add Overlay Button
 # -----------------------------
-def add_overlay_entry(text, start, end, overlay_settings_data, target="overlays"):
-    """Helper to add one overlay entry into a chosen session_state list."""
-    if target not in st.session_state:
-        st.session_state[target] = []
-
-    st.session_state[target].append({
+def make_overlay_entry(text, start_ms, end_ms, overlay_settings_data, color=None):
+    """
+    Build one overlay entry from text, timing (milliseconds) and
+    overlay_setting_fields data. ``color`` (e.g. from a subtitle file's
+    styling) overrides the text colour.
+    """
+    return {
         "text": str(text),
-        "start": int(start),
-        "end": int(end),
+        "start_ms": int(start_ms),
+        "end_ms": int(end_ms),
         "font_path": overlay_settings_data["font_path"],
         "font_size": int(overlay_settings_data["font_size"]),
-        "color": overlay_settings_data["text_color"],
+        "color": color or overlay_settings_data["text_color"],
         "bg_color": overlay_settings_data["bg_color"],
         "bg_opacity": overlay_settings_data["bg_opacity"], 
         "bottom_padding": int(overlay_settings_data["bottom_padding"]),
         "position": overlay_settings_data["pos_choice"],
         "x_percent": overlay_settings_data["x_percent"],
         "y_percent": overlay_settings_data["y_percent"]
+    }
+
+def add_overlay_entry(text, start_ms, end_ms, overlay_settings_data, target="overlays", color=None):
+    """Helper to add one overlay entry into a chosen session_state list."""
+    if target not in st.session_state:
+        st.session_state[target] = []
+
+    st.session_state[target].append(make_overlay_entry(text, start_ms, end_ms, overlay_settings_data, color=color))
+
+IMPORT_REJECT_REASONS = [
+    "Missing text",
+    "Start or end is not a number",
+    "Start time is negative",
+    "End time must be greater than start time",
+]
+
+def validate_overlay_frame(df):
+    """
+    Check a text/start/end(/color) table in one vectorized pass.
+
+    Times are seconds. Returns ``(accepted, rejected)``: accepted rows with
+    integer start_ms/end_ms columns, and rejected rows with a ``reason``.
+    """
+    text = df["text"].fillna("").astype(str).str.strip()
+    start = pd.to_numeric(df["start"], errors="coerce")
+    end = pd.to_numeric(df["end"], errors="coerce")
+    start_ms = (start * 1000).round()
+    end_ms = (end * 1000).round()
+
+    reason = np.select(
+        [text.eq(""), start.isna() | end.isna(), start_ms < 0, end_ms <= start_ms],
+        IMPORT_REJECT_REASONS,
+        default=""
+    )
+    ok = reason == ""
+
+    accepted = pd.DataFrame({
+        "text": text[ok],
+        "start_ms": start_ms[ok].astype("int64"),
+        "end_ms": end_ms[ok].astype("int64"),
     })
+    if "color" in df.columns:
+        color = df["color"].where(df["color"].astype(str).str.fullmatch(r"#[0-9a-fA-F]{6}"), None)
+        accepted["color"] = color[ok]
+    rejected = df[~ok].assign(reason=reason[~ok])
+    return accepted, rejected
+
+def add_overlay_entries(df, overlay_settings_data, target="overlays"):
+    """
+    Validate a whole table and append every valid row as an overlay entry at
+    once. Returns the rejected rows (with reasons) for a single summary.
+    """
+    accepted, rejected = validate_overlay_frame(df)
+    template = make_overlay_entry("", 0, 0, overlay_settings_data)
+    colors = accepted["color"] if "color" in accepted.columns else [None] * len(accepted)
+    entries = [
+        {**template, "text": text, "start_ms": int(start_ms), "end_ms": int(end_ms),
+         "color": color if isinstance(color, str) else template["color"]}
+        for text, start_ms, end_ms, color in zip(accepted["text"], accepted["start_ms"], accepted["end_ms"], colors)
+    ]
+    if target not in st.session_state:
+        st.session_state[target] = []
+
+    st.session_state[target].extend(entries)
+    return len(entries), rejected
+
+# -----------------------------
+# Preview Frame
+# -----------------------------
+def source_info(video_path):
+    """Probe metadata (size, fps, duration) for the uploaded video, cached per content hash."""
+    return mp.probe_media(video_path, mc.content_key(video_path))
+
+
+def show_preview(video_path, key_suffix, target="overlays", draft=None):
+    """Show one frame with the overlays active at a chosen time (plus an unsaved draft)."""
+    if not st.checkbox("Preview frame", key=f"preview_toggle_{key_suffix}",
+                       help="Composite the overlays onto a single frame without rendering the video"):
+        return
+    info = source_info(video_path)
+
+    overlays = list(st.session_state.get(target, []))
+    if draft is not None:
+        overlays.append(draft)
+
+    # Decode from the low-res proxy once it is ready
+    path, width, height = video_path, info["width"], info["height"]
+    proxy = pm.get_proxy(video_path)
+    if proxy is not None:
+        path, (width, height) = proxy.path, proxy.size
+        overlays = pm.scale_overlays(overlays, proxy.scale)
+
+    last_t = max(float(info["duration"] or 0) - 1.0 / (info["fps"] or 25), 0.0)
+    default_t = min(draft["start_ms"] / 1000 if draft is not None else 0.0, last_t)
+    preview_t = st.slider(
+        "Preview time (seconds)", 0.0, max(last_t, 0.1), default_t, 0.05,
+        key=f"preview_time_{key_suffix}"
+    )
+    try:
+        frame = pv.render_preview(path, overlays, min(preview_t, last_t), width, height)
+    except RuntimeError as e:
+        st.warning(f"Preview unavailable: {e}")
+        return
+    st.image(frame, caption=f"Frame at {preview_t:.2f}s", use_container_width=True)
 
 # -----------------------------
 # Clear All Data Button
 # -----------------------------
-def clear_all(clip, key_suffix, target="overlays"):
+def clear_all(key_suffix, target="overlays"):
     """
     Creates a 'Clear All' button that resets data depending on target:
       - manual_overlays → clears only manual overlays
@@ -259,9 +564,6 @@ def clear_all(clip, key_suffix, target="overlays"):
       - video → clears EVERYTHING (video + overlays + temp files)
     """
     if st.button("Clear All", help="Clear All Data or Fields", key=f"{key_suffix}"):
-        # Always close clip if provided
-        uf.close_and_remove(clip)
-
         if target == "manual_overlays":
             st.session_state.manual_overlays = []
 
@@ -281,11 +583,12 @@ def clear_all(clip, key_suffix, target="overlays"):
             st.session_state.video_key = uf.generate_key("video_upload")
             st.session_state.overlays_key = uf.generate_key("overlays_upload")
 
-            # Remove temp files
+            # Remove temp files and this session's outputs
             uf.remove_temp_files(
                 st.session_state.get("video_temp"),
                 st.session_state.get("overlays_temp")
             )
+            ws.get_workspace().end_session(mc.session_owner())
 
         elif target == "overlays":  # legacy fallback
             st.session_state.overlays = []
@@ -312,7 +615,7 @@ def show_current_overlays(key_suffix, target="overlays"):
                 pos_label += f" [{overlay['x_percent']}%, {overlay['y_percent']}%]"
             st.write(
                 f"**Overlay {i}:** {overlay['text']} "
-                f"({overlay['start']}s - {overlay['end']}s), Position: {pos_label}"
+                f"({uf.format_ms(overlay['start_ms'])} - {uf.format_ms(overlay['end_ms'])}), Position: {pos_label}"
             )
 
         # Delete button
@@ -0,0 +1,95 @@
+import os
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+import image_generator as ig
+import overlay_cache as oc
+import utility_functions as uf
+
+# ==============================
+# Parallel Overlay Rasterization
+# ==============================
+RASTER_WORKERS = int(os.environ.get("RASTER_WORKERS", "0")) or (os.cpu_count() or 1)
+# Below this many uncached cues the pool start-up cost outweighs the gain
+MIN_PARALLEL_CUES = int(os.environ.get("RASTER_MIN_PARALLEL_CUES", "32"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def overlay_render_args(overlay):
+    """Map a session_state overlay entry to render_text_rgba keyword arguments."""
+    bg_color = overlay["bg_color"]
+    return {
+        "text": overlay["text"],
+        "font_path": overlay["font_path"],
+        "font_size": overlay["font_size"],
+        "text_color": uf.hex_to_rgb(overlay["color"]),
+        "bg_color": tuple(bg_color) if bg_color else None,
+        "bg_opacity": overlay.get("bg_opacity", 0.5),
+        "padding": overlay["bottom_padding"],
+        "corner_radius": ig.CORNER_RADIUS,
+    }
+
+
+def _init_worker():
+    """Prepare the text backend (e.g. an offscreen Qt app) in each worker."""
+    ig.warm_up()
+
+
+def _render_in_worker(render_args):
+    rgba, _ = ig.render_text_rgba(**render_args)
+    return rgba
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the parent may already own a QApplication
+            _pool = ProcessPoolExecutor(
+                max_workers=RASTER_WORKERS,
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+def rasterize_overlays(overlays, cache=None):
+    """
+    Render every overlay and return ``[(rgba, (w, h)), ...]`` in cue order.
+
+    Cached bitmaps are reused; unique uncached cues are spread across a
+    process pool when there are enough of them to pay for it. Every cue is
+    drawn by the same renderer with the same arguments, so the output does
+    not depend on how the work was split.
+    """
+    cache = cache or oc.get_overlay_cache()
+    all_args = [overlay_render_args(o) for o in overlays]
+    keys = [cache.make_key(**args) for args in all_args]
+
+    bitmaps = {}
+    pending = {}
+    for key, args in zip(keys, all_args):
+        if key in bitmaps or key in pending:
+            continue
+        rgba = cache.get(key)
+        if rgba is None:
+            pending[key] = args
+        else:
+            bitmaps[key] = rgba
+
+    if len(pending) >= MIN_PARALLEL_CUES and RASTER_WORKERS > 1:
+        pending_keys = list(pending)
+        chunksize = max(1, len(pending_keys) // (RASTER_WORKERS * 4))
+        results = _get_pool().map(
+            _render_in_worker, [pending[k] for k in pending_keys], chunksize=chunksize
+        )
+        for key, rgba in zip(pending_keys, results):
+            bitmaps[key] = cache.put(key, rgba)
+    else:
+        for key, args in pending.items():
+            rgba, _ = ig.render_text_rgba(**args)
+            bitmaps[key] = cache.put(key, rgba)
+
+    return [(bitmaps[k], (bitmaps[k].shape[1], bitmaps[k].shape[0])) for k in keys]
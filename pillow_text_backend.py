@@ -0,0 +1,101 @@
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+import font_registry as fr
+
+# ==============================
+# Pillow (FreeType) text backend
+# ==============================
+# Same layout box the Qt backend measures text against
+WRAP_WIDTH = 1000
+# QFont sizes are points; the offscreen Qt platform renders at 96 DPI
+POINT_TO_PIXEL = 96 / 72
+
+def warm_up():
+    """Nothing to initialise; fonts are loaded lazily per (path, size)."""
+    return None
+
+@lru_cache(maxsize=256)
+def _load_font(font_path, font_size):
+    pixel_size = max(1, round(font_size * POINT_TO_PIXEL))
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, pixel_size)
+        except OSError:
+            pass
+    fallback = fr.bundled_fonts().get("arial")
+    if fallback:
+        return ImageFont.truetype(fallback, pixel_size)
+    return ImageFont.load_default(pixel_size)
+
+def _wrap_lines(text, font, max_width):
+    """Greedy word wrap matching Qt's TextWordWrap (explicit newlines kept)."""
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = word if not line else f"{line} {word}"
+            if not line or font.getlength(candidate) <= max_width:
+                line = candidate
+            else:
+                lines.append(line)
+                line = word
+        lines.append(line)
+    return lines
+
+def render_text_rgba(
+    text,
+    font_path=None,
+    font_family="Arial",
+    font_size=40,
+    text_color=(255, 255, 255),
+    bg_color=None,          # RGB tuple
+    bg_opacity=0.5,         # 0.0 to 1.0
+    padding=20,
+    corner_radius=7.5
+):
+    """
+    Render text with Pillow/FreeType.
+
+    Same contract as the Qt backend: returns ``(rgba, (width, height))`` with
+    wrapped, centered text on an optional rounded translucent box.
+    ``font_family`` is unused; Pillow always draws from ``font_path``.
+    """
+    font = _load_font(font_path, font_size)
+    lines = _wrap_lines(str(text), font, WRAP_WIDTH)
+
+    ascent, descent = font.getmetrics()
+    line_height = ascent + descent
+    line_widths = [int(np.ceil(font.getlength(line))) for line in lines]
+    text_w = max(line_widths) if line_widths else 0
+    text_h = line_height * len(lines)
+
+    # Final image size includes padding
+    img_width = text_w + padding * 2
+    img_height = text_h + padding * 2
+
+    img = Image.new("RGBA", (img_width, img_height), (0, 0, 0, 0))
+
+    # Draw rounded background rectangle with alpha
+    if bg_color and text_w and text_h:
+        r, g, b = bg_color
+        alpha = int(bg_opacity * 255)  # Convert to 0–255
+        ImageDraw.Draw(img).rounded_rectangle(
+            [padding, padding, padding + text_w - 1, padding + text_h - 1],
+            radius=corner_radius,
+            fill=(r, g, b, alpha)
+        )
+
+    # Draw centered text as a coverage mask, then composite it over the box
+    mask = Image.new("L", img.size, 0)
+    mask_draw = ImageDraw.Draw(mask)
+    for i, (line, line_w) in enumerate(zip(lines, line_widths)):
+        x = padding + (text_w - line_w) / 2
+        y = padding + i * line_height
+        mask_draw.text((x, y), line, font=font, fill=255)
+
+    text_layer = Image.new("RGBA", img.size, (*text_color, 0))
+    text_layer.putalpha(mask)
+    img = Image.alpha_composite(img, text_layer)
+
+    return np.array(img), (img_width, img_height)
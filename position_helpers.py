@@ -16,4 +16,16 @@ def compute_custom_xy_percent(vid_w, vid_h, overlay_w, overlay_h, x_percent, y_p
     """Compute pixel coordinates from percentages of the *available* area."""
     x = int((vid_w - overlay_w) * (x_percent / 100.0))
     y = int((vid_h - overlay_h) * (y_percent / 100.0))
-    return x, y
\ No newline at end of file
+    return x, y
+
+
+def resolve_position(position, vid_w, vid_h, overlay_w, overlay_h, x_percent=None, y_percent=None):
+    """Top-left pixel (x, y) for an overlay, matching moviepy's preset placement."""
+    if position == "Custom (percent)":
+        return compute_custom_xy_percent(
+            vid_w, vid_h, overlay_w, overlay_h, x_percent or 0, y_percent or 0
+        )
+    horizontal, vertical = PRESET_POSITIONS[position]
+    x = {"left": 0, "center": (vid_w - overlay_w) / 2, "right": vid_w - overlay_w}[horizontal]
+    y = {"top": 0, "center": (vid_h - overlay_h) / 2, "bottom": vid_h - overlay_h}[vertical]
+    return int(x), int(y)
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+import numpy as np
+import media_tools as mt
+import overlay_compositor as comp
+import parallel_raster as pr
+
+# ==============================
+# Single-frame Preview
+# ==============================
+FRAME_CACHE_SIZE = int(os.environ.get("PREVIEW_FRAME_CACHE_SIZE", "16"))
+
+_frames = OrderedDict()
+_frames_lock = threading.Lock()
+
+
+def decode_frame(path, t, width, height):
+    """
+    Decode the single frame at ``t`` with an input seek.
+
+    Frames are cached per (file, mtime, time), so changing overlay settings
+    re-blends onto the cached frame without decoding again.
+    """
+    key = (os.path.abspath(path), os.path.getmtime(path), round(float(t), 3))
+    with _frames_lock:
+        if key in _frames:
+            _frames.move_to_end(key)
+            return _frames[key]
+
+    cmd = [mt.ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-nostdin",
+           "-ss", f"{float(t):.3f}", "-i", path, "-map", "0:v:0", "-frames:v", "1",
+           "-f", "rawvideo", "-pix_fmt", "rgb24", "-"]
+    proc = subprocess.run(cmd, capture_output=True)
+    frame_bytes = width * height * 3
+    if proc.returncode != 0 or len(proc.stdout) < frame_bytes:
+        raise RuntimeError(f"Could not decode a frame at {t:.2f}s: {proc.stderr.decode(errors='replace')[-500:]}")
+    frame = np.frombuffer(proc.stdout[:frame_bytes], dtype=np.uint8).reshape(height, width, 3)
+
+    with _frames_lock:
+        _frames[key] = frame
+        while len(_frames) > FRAME_CACHE_SIZE:
+            _frames.popitem(last=False)
+    return frame
+
+
+def active_overlays(overlays, t):
+    """Overlay entries visible at ``t``, in cue order."""
+    visible = []
+    for overlay in overlays:
+        start, end = comp.overlay_span(overlay)
+        if start <= t < end:
+            visible.append(overlay)
+    return visible
+
+
+def render_preview(path, overlays, t, width, height):
+    """Frame at ``t`` with only the overlays active then composited in (RGB uint8)."""
+    frame = decode_frame(path, t, width, height)
+    visible = active_overlays(overlays, t)
+    if not visible:
+        return frame
+
+    rendered = pr.rasterize_overlays(visible)
+    layers = comp.build_layers(visible, rendered, width, height)
+    compositor = comp.OverlayCompositor(layers)
+    return compositor.composite_frame(frame, t)
@@ -0,0 +1,116 @@
+import os
+import threading
+import uuid
+import media_tools as mt
+import workspace as ws
+
+# ==============================
+# Proxy Media
+# ==============================
+PROXY_HEIGHT = int(os.environ.get("PROXY_HEIGHT", "540"))
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def proxy_size(width, height, proxy_height=PROXY_HEIGHT):
+    """Even-sized (w, h) with the source aspect ratio and ``proxy_height`` lines."""
+    scale = proxy_height / height
+    proxy_w = max(2, int(round(width * scale / 2)) * 2)
+    return proxy_w, proxy_height
+
+
+class ProxyJob:
+    """Background ffmpeg job that builds a low-res, all-intra proxy of one source."""
+
+    def __init__(self, source_path, width, height):
+        self.source_path = source_path
+        self.source_size = (width, height)
+        self.size = proxy_size(width, height)
+        self.scale = self.size[1] / height
+        self.path = os.path.join(ws.get_workspace().area_dir("proxies"),
+                                 f"proxy_{uuid.uuid4().hex}_{os.path.basename(source_path)}")
+        self.status = "pending"
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="proxy-build", daemon=True)
+
+    @property
+    def ready(self):
+        # The workspace may have evicted a finished proxy to stay under quota
+        return self.status == "done" and os.path.exists(self.path)
+
+    def start(self):
+        self.status = "running"
+        self._thread.start()
+        return self
+
+    def _run(self):
+        workspace = ws.get_workspace()
+        tmp_path = f"{self.path}.part.mp4"
+        workspace.pin(self.source_path)
+        workspace.pin(tmp_path)
+        try:
+            mt.run_ffmpeg([
+                "-i", self.source_path,
+                "-map", "0:v:0", "-map", "0:a?",
+                "-vf", f"scale={self.size[0]}:{self.size[1]}",
+                # Every frame a keyframe so seeks and scrubbing decode one frame
+                "-c:v", "libx264", "-preset", "ultrafast", "-tune", "fastdecode",
+                "-crf", "28", "-g", "1", "-pix_fmt", "yuv420p",
+                "-c:a", "aac", "-b:a", "96k",
+                tmp_path
+            ])
+            os.replace(tmp_path, self.path)
+            workspace.touch(self.path)
+            self.status = "done"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "failed"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        finally:
+            workspace.unpin(tmp_path)
+            workspace.unpin(self.source_path)
+        workspace.enforce_quota()
+
+
+def request_proxy(source_path, width, height, media_key=None):
+    """
+    Start building a proxy for ``source_path`` if it is larger than the proxy
+    resolution and none exists yet for ``media_key`` (defaults to the path).
+    Returns the job, or None when the source is small enough to edit directly.
+    """
+    if height <= PROXY_HEIGHT:
+        return None
+    key = media_key or os.path.abspath(source_path)
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is None or job.status == "failed" or (job.status == "done" and not job.ready):
+            job = ProxyJob(source_path, width, height).start()
+            _jobs[key] = job
+        return job
+
+
+def get_proxy(source_path, media_key=None):
+    """
+    The finished proxy job for ``source_path`` (keyed as in request_proxy),
+    or None. Marks the proxy as recently used so the workspace keeps it.
+    """
+    key = media_key or os.path.abspath(source_path)
+    with _jobs_lock:
+        job = _jobs.get(key)
+    if job is None or not job.ready:
+        return None
+    ws.get_workspace().touch(job.path)
+    return job
+
+
+def scale_overlays(overlays, scale):
+    """Copies of the overlay entries with font size and padding scaled for a proxy."""
+    scaled = []
+    for overlay in overlays:
+        overlay = dict(overlay)
+        overlay["font_size"] = max(1, int(round(overlay["font_size"] * scale)))
+        overlay["bottom_padding"] = int(round(overlay["bottom_padding"] * scale))
+        scaled.append(overlay)
+    return scaled
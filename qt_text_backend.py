@@ -0,0 +1,119 @@
+import os
+import numpy as np
+os.environ["QT_QPA_PLATFORM"] = "offscreen"
+from PySide6.QtGui import QFont, QGuiApplication, QImage, QPainter, QColor,QPainterPath
+from PySide6.QtCore import Qt, QRectF
+import tempfile
+import font_registry as fr
+import workspace as ws
+
+# ==============================
+# Qt (QPainter) text backend
+# ==============================
+_app = None
+
+def warm_up():
+    """Create the offscreen Qt application and register the bundled fonts."""
+    global _app
+    if not QGuiApplication.instance():
+        _app = QGuiApplication([])
+    fr.preload_bundled_fonts()
+
+def _measure_text(text, font):
+    """Return the wrapped text rectangle for the given font."""
+    temp_img = QImage(1, 1, QImage.Format_ARGB32)
+    painter = QPainter(temp_img)
+    painter.setFont(font)
+    text_rect = painter.boundingRect(0, 0, 1000, 1000, Qt.AlignLeft | Qt.TextWordWrap, text)
+    painter.end()
+    return text_rect
+
+def _paint_text(img, text, font, text_rect, text_color, bg_color, bg_opacity, padding, corner_radius):
+    """Paint the background box and centered text into an already-sized image."""
+    img.fill(Qt.transparent)
+
+    painter = QPainter(img)
+    painter.setFont(font)
+
+    # Draw rounded background rectangle with alpha
+    if bg_color:
+        r, g, b = bg_color
+        alpha = int(bg_opacity * 255)  # Convert to 0–255
+        bg_rect = QRectF(padding, padding, text_rect.width(), text_rect.height())
+        path = QPainterPath()
+        path.addRoundedRect(bg_rect, corner_radius, corner_radius)
+        painter.fillPath(path, QColor(r, g, b, alpha))
+
+    # Draw centered text
+    painter.setPen(QColor(*text_color))
+    painter.drawText(QRectF(padding, padding, text_rect.width(), text_rect.height()),
+                     text, Qt.AlignCenter | Qt.TextWordWrap)
+
+    painter.end()
+
+def _resolve_font(font_path, font_family, font_size):
+    # Custom fonts are registered once per process by the registry
+    family = fr.register_font(font_path)
+    if family:
+        font_family = family
+
+    return QFont(font_family, font_size)
+
+def render_text_rgba(
+    text,
+    font_path=None,
+    font_family="Arial",
+    font_size=40,
+    text_color=(255, 255, 255),
+    bg_color=None,          # RGB tuple
+    bg_opacity=0.5,         # 0.0 to 1.0
+    padding=20,
+    corner_radius=7.5
+):
+    """
+    Render text straight into a NumPy buffer.
+
+    Returns ``(rgba, (width, height))`` where ``rgba`` is a ``(h, w, 4)`` uint8
+    array with straight (non-premultiplied) alpha. The QImage paints directly
+    into the array's memory, so no PNG is encoded and no pixels are copied.
+    """
+    font = _resolve_font(font_path, font_family, font_size)
+    text_rect = _measure_text(text, font)
+
+    # Final image size includes padding
+    img_width = text_rect.width() + padding * 2
+    img_height = text_rect.height() + padding * 2
+
+    rgba = np.empty((img_height, img_width, 4), dtype=np.uint8)
+    img = QImage(rgba.data, img_width, img_height, img_width * 4, QImage.Format_RGBA8888)
+    _paint_text(img, text, font, text_rect, text_color, bg_color, bg_opacity, padding, corner_radius)
+    del img  # release the QImage before handing the buffer out
+
+    return rgba, (img_width, img_height)
+
+def create_image_qt_text_bg(
+    text,
+    font_path=None,
+    font_family="Arial",
+    font_size=40,
+    text_color=(255, 255, 255),
+    bg_color=None,          # RGB tuple
+    bg_opacity=0.5,         # 0.0 to 1.0
+    padding=20,
+    corner_radius=7.5
+):
+    font = _resolve_font(font_path, font_family, font_size)
+    text_rect = _measure_text(text, font)
+
+    # Final image size includes padding
+    img_width = text_rect.width() + padding * 2
+    img_height = text_rect.height() + padding * 2
+
+    img = QImage(img_width, img_height, QImage.Format_ARGB32)
+    _paint_text(img, text, font, text_rect, text_color, bg_color, bg_opacity, padding, corner_radius)
+
+    # Save to temp file
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".png", dir=ws.get_workspace().area_dir("overlay_pngs"))
+    img.save(temp_file.name)
+    temp_file.close()
+    return temp_file.name
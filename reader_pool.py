@@ -0,0 +1,235 @@
+import itertools
+import os
+import threading
+import time
+from collections import Counter
+from moviepy import VideoFileClip
+import utility_functions as uf
+import workspace as ws
+
+# ==============================
+# Shared Video Reader Pool
+# ==============================
+MAX_READERS = int(os.environ.get("READER_POOL_MAX", "16"))
+IDLE_TIMEOUT = float(os.environ.get("READER_IDLE_SECONDS", "300"))
+# Shared readers nobody has touched for this long belong to abandoned sessions
+STALE_TIMEOUT = float(os.environ.get("READER_STALE_SECONDS", "1800"))
+# How long acquire waits for a reader to be released when the pool is full
+WAIT_TIMEOUT = float(os.environ.get("READER_WAIT_SECONDS", "10"))
+
+
+class PooledReader:
+    __slots__ = ("key", "path", "clip", "exclusive", "owners", "last_used")
+
+    def __init__(self, key, path, clip, exclusive):
+        self.key = key
+        self.path = path
+        self.clip = clip
+        self.exclusive = exclusive
+        self.owners = Counter()
+        self.last_used = time.monotonic()
+
+    @property
+    def refs(self):
+        return sum(self.owners.values())
+
+
+class ReaderPool:
+    """
+    Hands out VideoFileClip readers shared per media file.
+
+    Each acquire adds a reference for its owner (a session id); a reader is
+    closed once it has no references and has sat idle for ``idle_timeout``
+    seconds, or straight away for exclusive readers. ``max_readers`` caps
+    the ffmpeg reader processes open across all sessions; when every reader
+    is in use, acquire waits up to ``wait_timeout`` seconds for one. A
+    session's references are dropped when the workspace ends that session.
+    """
+
+    def __init__(self, max_readers=MAX_READERS, idle_timeout=IDLE_TIMEOUT, stale_timeout=STALE_TIMEOUT,
+                 wait_timeout=WAIT_TIMEOUT):
+        self.max_readers = max_readers
+        self.idle_timeout = idle_timeout
+        self.stale_timeout = stale_timeout
+        self.wait_timeout = wait_timeout
+        self._readers = {}
+        self._by_clip = {}
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._opening = 0
+        self._pending = set()
+        self._exclusive_ids = itertools.count()
+        self._reaper = None
+        self.opened = 0
+        self.reused = 0
+        self.evicted = 0
+
+    # ----------------------------
+    # Acquire / release
+    # ----------------------------
+    def acquire(self, path, owner, exclusive=False):
+        """
+        A reader for ``path``. Exclusive readers are private to the caller
+        (for frame-by-frame renders); shared ones only serve metadata.
+        Raises RuntimeError if the pool stays full for ``wait_timeout``.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            self._start_reaper()
+            self._reap(time.monotonic())
+            if not exclusive:
+                # Another session is already opening this file: wait and share it
+                deadline = time.monotonic() + self.wait_timeout
+                while path in self._pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RuntimeError("The video reader is still starting; try again shortly")
+                    self._released.wait(remaining)
+                entry = self._readers.get(path)
+                if entry is not None and getattr(entry.clip, "reader", None) is not None:
+                    self.reused += 1
+                    return self._add_owner(entry, owner)
+                if entry is not None:
+                    self._close(entry)
+            # Reserve a slot, then open outside the lock: starting ffmpeg can
+            # take seconds and must not block other sessions' touch/release/stats
+            self._make_room()
+            self._opening += 1
+            if not exclusive:
+                self._pending.add(path)
+
+        try:
+            clip = VideoFileClip(path)
+        except Exception:
+            with self._lock:
+                self._finish_opening(path)
+            raise
+
+        with self._lock:
+            self._finish_opening(path)
+            key = (path, next(self._exclusive_ids)) if exclusive else path
+            entry = PooledReader(key, path, clip, exclusive)
+            self._readers[key] = entry
+            self._by_clip[id(clip)] = entry
+            # Keep the workspace from evicting a file with an open reader
+            ws.get_workspace().pin(path)
+            self.opened += 1
+            return self._add_owner(entry, owner)
+
+    def _finish_opening(self, path):
+        self._opening -= 1
+        self._pending.discard(path)
+        self._released.notify_all()
+
+    def _add_owner(self, entry, owner):
+        entry.owners[owner] += 1
+        entry.last_used = time.monotonic()
+        return entry.clip
+
+    def touch(self, clip):
+        """Mark a held reader as in use so idle and stale eviction skip it."""
+        with self._lock:
+            entry = self._by_clip.get(id(clip))
+            if entry is not None:
+                entry.last_used = time.monotonic()
+            return entry is not None
+
+    def release(self, clip, owner):
+        """Drop one of ``owner``'s references to ``clip`` (a no-op once evicted)."""
+        with self._lock:
+            entry = self._by_clip.get(id(clip))
+            if entry is None or entry.owners[owner] <= 0:
+                return
+            entry.owners[owner] -= 1
+            if entry.owners[owner] == 0:
+                del entry.owners[owner]
+            entry.last_used = time.monotonic()
+            if entry.exclusive and not entry.owners:
+                self._close(entry)
+            self._released.notify_all()
+
+    def release_owner(self, owner):
+        """Drop every reference held by ``owner``, e.g. when its session ends."""
+        with self._lock:
+            for entry in list(self._readers.values()):
+                if entry.owners.pop(owner, None) and entry.exclusive:
+                    self._close(entry)
+            self._released.notify_all()
+
+    # ----------------------------
+    # Eviction
+    # ----------------------------
+    def _close(self, entry):
+        self._readers.pop(entry.key, None)
+        self._by_clip.pop(id(entry.clip), None)
+        uf.close_and_remove(entry.clip)
+        ws.get_workspace().unpin(entry.path)
+
+    def _reap(self, now):
+        for entry in list(self._readers.values()):
+            idle = now - entry.last_used
+            if (not entry.owners and idle >= self.idle_timeout) or \
+                    (not entry.exclusive and idle >= self.stale_timeout):
+                self._close(entry)
+                self.evicted += 1
+
+    def _make_room(self):
+        # Called with the lock held; waiting on the condition releases it
+        deadline = time.monotonic() + self.wait_timeout
+        while len(self._readers) + self._opening >= self.max_readers:
+            idle = [e for e in self._readers.values() if not e.owners]
+            if idle:
+                self._close(min(idle, key=lambda e: e.last_used))
+                self.evicted += 1
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(f"All {self.max_readers} video readers are in use; try again shortly")
+            self._released.wait(remaining)
+
+    def _start_reaper(self):
+        if self._reaper is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(max(1.0, min(self.idle_timeout, self.stale_timeout) / 2))
+                with self._lock:
+                    self._reap(time.monotonic())
+                    self._released.notify_all()
+
+        self._reaper = threading.Thread(target=loop, name="reader-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    # ----------------------------
+    # Stats
+    # ----------------------------
+    def stats(self):
+        with self._lock:
+            by_owner = Counter()
+            for entry in self._readers.values():
+                for owner in entry.owners:
+                    by_owner[owner] += 1
+            return {
+                "open_readers": len(self._readers),
+                "idle_readers": sum(1 for e in self._readers.values() if not e.owners),
+                "max_readers": self.max_readers,
+                "readers_by_session": dict(by_owner),
+                "opened": self.opened,
+                "reused": self.reused,
+                "evicted": self.evicted,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide reader pool shared by every Streamlit session."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ReaderPool()
+            ws.get_workspace().on_session_end(_pool.release_owner)
+        return _pool
@@ -0,0 +1,254 @@
+import queue
+import subprocess
+import threading
+import time
+import numpy as np
+import encoder_profiles as ep
+import media_tools as mt
+
+# ==============================
+# Pipelined decode → composite → encode
+# ==============================
+DEFAULT_QUEUE_SIZE = 8
+_DONE = object()
+
+
+def _drain(stream):
+    """Read ``stream`` to EOF on a thread, so ffmpeg never blocks on a full stderr pipe."""
+    chunks = []
+    thread = threading.Thread(target=lambda: chunks.append(stream.read()), daemon=True)
+    thread.start()
+    return thread, chunks
+
+
+class StageStats:
+    """Frames handled, busy time and throughput of one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0
+        self.busy_seconds = 0.0
+        self.started = None
+        self.finished = None
+
+    def as_dict(self):
+        end = self.finished or time.perf_counter()
+        wall = end - self.started if self.started else 0.0
+        return {
+            "stage": self.name,
+            "frames": self.frames,
+            "busy_seconds": self.busy_seconds,
+            "fps": self.frames / self.busy_seconds if self.busy_seconds else 0.0,
+            "utilisation": self.busy_seconds / wall if wall else 0.0,
+        }
+
+
+class RenderPipeline:
+    """
+    Three threads joined by bounded queues:
+
+    * decode    – ffmpeg pipes raw RGB frames out of the source
+    * composite – the overlay compositor blends text into each frame
+    * encode    – frames are piped into an ffmpeg encoder (source audio mapped in)
+
+    The bounded queues give backpressure, so memory stays flat at roughly
+    ``2 * queue_size`` frames whatever the length of the video. ``stats()``
+    reports per-stage throughput and current/peak queue depth to show which
+    stage is the bottleneck.
+    """
+
+    def __init__(self, source_path, compositor, output_path, width, height, fps,
+                 queue_size=DEFAULT_QUEUE_SIZE, video_args=None, audio_args=None,
+                 start=0.0, duration=None, include_audio=True):
+        self.source_path = source_path
+        self.compositor = compositor
+        self.output_path = output_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.video_args = video_args or ep.video_args(size=(width, height))
+        self.audio_args = audio_args or ["-c:a", "aac"]
+        # Optional sub-range of the source; frame times stay local to it
+        self.start = start
+        self.duration = duration
+        self.include_audio = include_audio
+
+        self.decoded = queue.Queue(maxsize=queue_size)
+        self.composited = queue.Queue(maxsize=queue_size)
+        self.peak_depth = {"decoded": 0, "composited": 0}
+        self.stages = {name: StageStats(name) for name in ("decode", "composite", "encode")}
+
+        self._abort = threading.Event()
+        self._errors = []
+        self._procs = []
+
+    # -----------------------------
+    # Queue helpers (abort-aware)
+    # -----------------------------
+    def _put(self, q, name, item):
+        while not self._abort.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                self.peak_depth[name] = max(self.peak_depth[name], q.qsize())
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._abort.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, exc):
+        self._errors.append(exc)
+        self._abort.set()
+        for proc in self._procs:
+            if proc.poll() is None:
+                proc.kill()
+
+    # -----------------------------
+    # Stages
+    # -----------------------------
+    def _decode(self):
+        stats = self.stages["decode"]
+        stats.started = time.perf_counter()
+        seek = ["-ss", f"{self.start:.6f}"] if self.start else []
+        until = ["-t", f"{self.duration:.6f}"] if self.duration is not None else []
+        cmd = [mt.ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-nostdin",
+               *seek, "-i", self.source_path, *until,
+               "-map", "0:v:0", "-r", str(self.fps), "-f", "rawvideo", "-pix_fmt", "rgb24", "-"]
+        frame_bytes = self.width * self.height * 3
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self._procs.append(proc)
+            stderr_thread, stderr_chunks = _drain(proc.stderr)
+            index = 0
+            while not self._abort.is_set():
+                t0 = time.perf_counter()
+                buf = bytearray(frame_bytes)
+                n = proc.stdout.readinto(buf)
+                if n < frame_bytes:
+                    break
+                frame = np.frombuffer(buf, dtype=np.uint8).reshape(self.height, self.width, 3)
+                t = index / self.fps
+                stats.busy_seconds += time.perf_counter() - t0
+                stats.frames += 1
+                index += 1
+                if not self._put(self.decoded, "decoded", (t, frame)):
+                    break
+            proc.stdout.close()
+            proc.wait()
+            stderr_thread.join()
+            if proc.returncode != 0 and not self._abort.is_set():
+                stderr = b"".join(stderr_chunks).decode(errors="replace").strip()
+                raise RuntimeError(f"ffmpeg decoder failed: {stderr[-2000:]}")
+        except Exception as e:
+            self._fail(e)
+        finally:
+            stats.finished = time.perf_counter()
+            self._put(self.decoded, "decoded", _DONE)
+
+    def _composite(self):
+        stats = self.stages["composite"]
+        stats.started = time.perf_counter()
+        try:
+            while True:
+                item = self._get(self.decoded)
+                if item is _DONE:
+                    break
+                t, frame = item
+                t0 = time.perf_counter()
+                frame = self.compositor.composite_frame(frame, t)
+                stats.busy_seconds += time.perf_counter() - t0
+                stats.frames += 1
+                if not self._put(self.composited, "composited", frame):
+                    break
+        except Exception as e:
+            self._fail(e)
+        finally:
+            stats.finished = time.perf_counter()
+            self._put(self.composited, "composited", _DONE)
+
+    def _encode(self):
+        stats = self.stages["encode"]
+        stats.started = time.perf_counter()
+        audio_in, audio_out = [], []
+        if self.include_audio:
+            seek = ["-ss", f"{self.start:.6f}"] if self.start else []
+            until = ["-t", f"{self.duration:.6f}"] if self.duration is not None else []
+            audio_in = [*seek, *until, "-i", self.source_path]
+            audio_out = ["-map", "1:a?", *self.audio_args]
+        cmd = [mt.ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+               "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{self.width}x{self.height}",
+               "-r", str(self.fps), "-i", "-", *audio_in,
+               "-map", "0:v", *audio_out, *self.video_args, self.output_path]
+        try:
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            self._procs.append(proc)
+            stderr_thread, stderr_chunks = _drain(proc.stderr)
+            exited_early = False
+            try:
+                while True:
+                    frame = self._get(self.composited)
+                    if frame is _DONE:
+                        break
+                    t0 = time.perf_counter()
+                    proc.stdin.write(np.ascontiguousarray(frame).data)
+                    stats.busy_seconds += time.perf_counter() - t0
+                    stats.frames += 1
+                proc.stdin.close()
+            except BrokenPipeError:
+                # The encoder exited mid-stream; its stderr says why
+                exited_early = True
+            proc.wait()
+            stderr_thread.join()
+            if (proc.returncode != 0 or exited_early) and not self._abort.is_set():
+                stderr = b"".join(stderr_chunks).decode(errors="replace").strip()
+                raise RuntimeError(f"ffmpeg encoder failed: {stderr[-2000:] or 'exited before all frames were written'}")
+        except Exception as e:
+            self._fail(e)
+        finally:
+            stats.finished = time.perf_counter()
+
+    # -----------------------------
+    # Run
+    # -----------------------------
+    def stats(self):
+        return {
+            "stages": [self.stages[name].as_dict() for name in ("decode", "composite", "encode")],
+            "queue_depth": {"decoded": self.decoded.qsize(), "composited": self.composited.qsize()},
+            "peak_queue_depth": dict(self.peak_depth),
+        }
+
+    def bottleneck(self):
+        """Stage with the lowest throughput."""
+        stages = [s for s in self.stats()["stages"] if s["frames"]]
+        return min(stages, key=lambda s: s["fps"])["stage"] if stages else None
+
+    def run(self, progress=None, poll_interval=0.25):
+        """
+        Run all stages and block until done.
+
+        ``progress(stats)`` is called from the calling thread while the
+        pipeline runs (Streamlit elements can't be updated from workers).
+        """
+        threads = [
+            threading.Thread(target=self._decode, name="pipeline-decode", daemon=True),
+            threading.Thread(target=self._composite, name="pipeline-composite", daemon=True),
+            threading.Thread(target=self._encode, name="pipeline-encode", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            if progress:
+                progress(self.stats())
+            threads[-1].join(poll_interval)
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+        return self.stats()
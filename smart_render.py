@@ -0,0 +1,179 @@
+import os
+import time
+from fractions import Fraction
+import encoder_profiles as ep
+import media_tools as mt
+import workspace as ws
+
+# ==============================
+# Smart Render
+# ==============================
+# Re-encoded segments must match the source for a lossless concat
+SUPPORTED_CODECS = {"h264"}
+SUPPORTED_PIX_FMTS = {"yuv420p"}
+# ffprobe H.264 profile → the libx264 profile that produces a compatible stream
+X264_PROFILES = {"Constrained Baseline": "baseline", "Baseline": "baseline", "Main": "main", "High": "high"}
+SQUARE_SARS = {None, "", "N/A", "0:1", "1:1"}
+
+
+class Segment:
+    """Keyframe-bounded stretch of the source, either stream-copied or re-encoded."""
+
+    __slots__ = ("start", "end", "reencode")
+
+    def __init__(self, start, end, reencode):
+        self.start = start
+        self.end = end
+        self.reencode = reencode
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"Segment({self.start:.3f}-{self.end:.3f}, {'reencode' if self.reencode else 'copy'})"
+
+
+def text_ranges(spans):
+    """(start, end) of every span that carries an overlay, in time order."""
+    return [(span.start, span.end) for span in spans if not span.passthrough]
+
+
+def plan_segments(ranges, keyframes, duration):
+    """
+    Mark each GOP (keyframe to keyframe) that intersects a text range for
+    re-encoding and merge neighbouring GOPs of the same kind into segments.
+    """
+    bounds = [0.0] + sorted(k for k in keyframes if 0.0 < k < duration) + [duration]
+    segments = []
+    ri = 0
+    for gop_start, gop_end in zip(bounds, bounds[1:]):
+        while ri < len(ranges) and ranges[ri][1] <= gop_start:
+            ri += 1
+        reencode = ri < len(ranges) and ranges[ri][0] < gop_end
+        if segments and segments[-1].reencode == reencode:
+            segments[-1].end = gop_end
+        else:
+            segments.append(Segment(gop_start, gop_end, reencode))
+    return segments
+
+
+def check_eligible(source_path):
+    """
+    Probe the source's video stream and check it can be smart-rendered.
+    Returns ``(stream, reason)``: reason is None if it can, else why it can't
+    (stream is None when the probe itself failed).
+    """
+    if mt.ffprobe_binary() is None:
+        return None, "ffprobe is not installed"
+    try:
+        stream = mt.probe_video_stream(source_path)
+    except RuntimeError as e:
+        return None, str(e)
+    return stream, _stream_ineligibility(stream)
+
+
+def _stream_ineligibility(stream):
+    if stream.get("codec_name") not in SUPPORTED_CODECS:
+        return f"video codec {stream.get('codec_name')} is not supported (needs H.264)"
+    if stream.get("pix_fmt") not in SUPPORTED_PIX_FMTS:
+        return f"pixel format {stream.get('pix_fmt')} is not supported (needs yuv420p)"
+    if stream.get("profile") not in X264_PROFILES:
+        return f"H.264 profile {stream.get('profile')} can't be matched by the encoder"
+    if not isinstance(stream.get("level"), int) or stream["level"] <= 0:
+        return "the H.264 level is unknown"
+    try:
+        if Fraction(stream["r_frame_rate"]) != Fraction(stream["avg_frame_rate"]):
+            return "the frame rate is variable"
+    except (KeyError, ValueError, ZeroDivisionError):
+        return "the frame rate is unknown"
+    if stream.get("sample_aspect_ratio") not in SQUARE_SARS:
+        return f"non-square pixels (SAR {stream['sample_aspect_ratio']}) are not supported"
+    return None
+
+
+def match_source_args(stream):
+    """
+    libx264 arguments that make re-encoded segments match the source stream
+    (profile, level, frame rate and size), so they concat cleanly with the
+    stream-copied GOPs.
+    """
+    return [
+        "-profile:v", X264_PROFILES[stream["profile"]],
+        "-level", f"{stream['level'] / 10:g}",
+        "-r", stream["r_frame_rate"],
+        "-s", f"{stream['width']}x{stream['height']}",
+    ]
+
+
+def _copy_segment(source_path, segment, out_path):
+    mt.run_ffmpeg([
+        # Nudge past the keyframe so input seeking lands exactly on it
+        "-ss", f"{segment.start + 0.001:.6f}", "-i", source_path,
+        "-t", f"{segment.duration:.6f}",
+        "-map", "0:v:0", "-c", "copy", "-avoid_negative_ts", "make_zero",
+        out_path
+    ])
+
+
+def _reencode_segment(clip, compositor, segment, out_path, timescale, profile, match_args):
+    offset = segment.start
+    sub = clip.subclipped(segment.start, segment.end)
+    sub = sub.transform(lambda get_frame, t: compositor.composite_frame(get_frame(t), t + offset))
+    write_kwargs = ep.moviepy_write_kwargs(profile, sub.size)
+    write_kwargs["ffmpeg_params"] += match_args
+    if timescale:
+        write_kwargs["ffmpeg_params"] += ["-video_track_timescale", str(timescale)]
+    sub.write_videofile(out_path, audio=False, logger=None, **write_kwargs)
+
+
+def smart_render(clip, source_path, compositor, output_path, progress=None, profile=None, stream=None):
+    """
+    Render ``clip`` with overlays, re-encoding only the GOPs that carry text.
+
+    Uncovered GOPs are stream-copied, all segments are joined with the concat
+    demuxer and the source audio is muxed back in. ``progress(done, total)``
+    is called after each segment. ``stream`` is the probe returned by an
+    eligible check_eligible; without it the source is checked here. Returns a
+    stats dict. Raises RuntimeError if the source is not eligible or ffmpeg
+    fails.
+    """
+    started = time.perf_counter()
+    duration = clip.duration
+    spans = compositor.timeline.spans
+    if stream is None:
+        stream, reason = check_eligible(source_path)
+        if reason:
+            raise RuntimeError(f"Smart render unavailable: {reason}")
+    segments = plan_segments(text_ranges(spans), mt.probe_keyframes(source_path), duration)
+    match_args = match_source_args(stream)
+    time_base = stream.get("time_base", "")
+    timescale = time_base.split("/")[1] if "/" in time_base else None
+
+    work_dir = ws.get_workspace().make_job_dir(prefix="smart_render_")
+    try:
+        segment_paths = []
+        for i, segment in enumerate(segments):
+            seg_path = os.path.join(work_dir, f"seg_{i:05d}.mp4")
+            if segment.reencode:
+                _reencode_segment(clip, compositor, segment, seg_path, timescale, profile, match_args)
+            else:
+                _copy_segment(source_path, segment, seg_path)
+            segment_paths.append(seg_path)
+            if progress:
+                progress(i + 1, len(segments))
+
+        video_only = os.path.join(work_dir, "video_only.mp4")
+        mt.concat_copy(segment_paths, video_only, os.path.join(work_dir, "segments.txt"))
+        mt.mux_source_audio(video_only, source_path, output_path)
+    finally:
+        ws.get_workspace().remove_job_dir(work_dir)
+
+    reencoded = sum(s.duration for s in segments if s.reencode)
+    return {
+        "segments": len(segments),
+        "reencoded_segments": sum(1 for s in segments if s.reencode),
+        "reencoded_seconds": reencoded,
+        "reencoded_fraction": reencoded / duration if duration else 0.0,
+        "elapsed_seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,69 @@
+import os
+import media_tools as mt
+import utility_functions as uf
+import workspace as ws
+
+# ==============================
+# Soft Subtitles (text track, no re-encode)
+# ==============================
+# label → (container extension, subtitle codec, sidecar format)
+TRACK_FORMATS = {
+    "MP4 (mov_text)": (".mp4", "mov_text", "srt"),
+    "MKV (SRT)": (".mkv", "srt", "srt"),
+    "MKV (WebVTT)": (".mkv", "webvtt", "vtt"),
+}
+
+
+def _cues(overlays):
+    """(start_ms, end_ms, text) for every overlay, sorted by start time."""
+    cues = [(int(o["start_ms"]), int(o["end_ms"]), str(o["text"]).strip()) for o in overlays]
+    return sorted((c for c in cues if c[2] and c[1] > c[0]), key=lambda c: (c[0], c[1]))
+
+
+def to_srt(overlays):
+    blocks = []
+    for i, (start, end, text) in enumerate(_cues(overlays), 1):
+        blocks.append(f"{i}\n{uf.format_ms(start, ',')} --> {uf.format_ms(end, ',')}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def to_webvtt(overlays):
+    blocks = ["WEBVTT\n"]
+    for start, end, text in _cues(overlays):
+        # "-->" inside cue text would end the cue early
+        blocks.append(f"{uf.format_ms(start)} --> {uf.format_ms(end)}\n{text.replace('-->', '->')}\n")
+    return "\n".join(blocks)
+
+
+def sidecar_text(overlays, track_format):
+    """Subtitle file contents and extension for a TRACK_FORMATS label."""
+    _, _, sidecar = TRACK_FORMATS[track_format]
+    if sidecar == "vtt":
+        return to_webvtt(overlays), ".vtt"
+    return to_srt(overlays), ".srt"
+
+
+def mux_soft_subtitles(source_path, overlays, output_path, track_format="MP4 (mov_text)"):
+    """
+    Stream-copy the source's audio/video and add the overlays as a text track.
+
+    Nothing is re-encoded, so this takes seconds even for long videos.
+    """
+    _, codec, _ = TRACK_FORMATS[track_format]
+    text, ext = sidecar_text(overlays, track_format)
+
+    work_dir = ws.get_workspace().make_job_dir(prefix="soft_subs_")
+    try:
+        subs_path = os.path.join(work_dir, f"subtitles{ext}")
+        with open(subs_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        mt.run_ffmpeg([
+            "-i", source_path, "-i", subs_path,
+            "-map", "0:v", "-map", "0:a?", "-map", "1:0",
+            "-c:v", "copy", "-c:a", "copy", "-c:s", codec,
+            "-disposition:s:0", "default",
+            output_path
+        ])
+    finally:
+        ws.get_workspace().remove_job_dir(work_dir)
+    return output_path
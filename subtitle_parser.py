@@ -0,0 +1,204 @@
+import html
+import io
+import re
+from collections import namedtuple
+
+# ==============================
+# Subtitle File Parser (SRT / WebVTT / ASS)
+# ==============================
+# One pass over the file, line by line: memory stays proportional to a single
+# cue, and parsing is linear in the file size.
+SUBTITLE_EXTENSIONS = {".srt": "srt", ".vtt": "webvtt", ".ass": "ass", ".ssa": "ass"}
+CUE_FIELDS = ["text", "start", "end", "color"]
+
+Cue = namedtuple("Cue", CUE_FIELDS)
+
+_TIMING_RE = re.compile(
+    r"^\s*((?:\d+:)?\d{1,2}:\d{2}[,.]\d{1,3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[,.]\d{1,3})"
+)
+_TIME_RE = re.compile(r"^(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{1,3})$")
+_TAG_RE = re.compile(r"<[^>]*>")
+_ASS_OVERRIDE_RE = re.compile(r"\{[^}]*\}")
+_FONT_COLOR_RE = re.compile(r"<font[^>]*color\s*=\s*[\"']?(#[0-9a-fA-F]{6}|#[0-9a-fA-F]{3})", re.I)
+_VTT_CLASS_RE = re.compile(r"<c((?:\.[\w-]+)+)>")
+_ASS_COLOR_RE = re.compile(r"\\1?c&H([0-9a-fA-F]{1,8})&?")
+
+# WebVTT's default colour classes
+VTT_COLORS = {
+    "white": "#FFFFFF", "lime": "#00FF00", "cyan": "#00FFFF", "red": "#FF0000",
+    "yellow": "#FFFF00", "magenta": "#FF00FF", "blue": "#0000FF", "black": "#000000",
+}
+
+
+def parse_timestamp(value):
+    """'hh:mm:ss,mmm', 'mm:ss.mmm' or ASS 'h:mm:ss.cc' → seconds (float)."""
+    match = _TIME_RE.match(value.strip())
+    if not match:
+        raise ValueError(f"Bad timestamp: {value!r}")
+    h, m, s, frac = match.groups()
+    return int(h or 0) * 3600 + int(m) * 60 + int(s) + int(frac) / 10 ** len(frac)
+
+
+def _parse_times(start, end, number, line):
+    """Parse a cue's start and end; a bad value raises ValueError naming the line."""
+    try:
+        return parse_timestamp(start), parse_timestamp(end)
+    except ValueError as e:
+        raise ValueError(f"{e} on line {number}: {line.strip()!r}") from None
+
+
+def _clean_markup(text):
+    text = _TAG_RE.sub("", text)
+    text = _ASS_OVERRIDE_RE.sub("", text)
+    return html.unescape(text).strip()
+
+
+def _ass_color(value):
+    # &HAABBGGRR (alpha optional) → #RRGGBB
+    value = value.rjust(8, "0")[-6:]
+    return f"#{value[4:6]}{value[2:4]}{value[0:2]}".upper()
+
+
+# ----------------------------
+# SRT & WebVTT
+# ----------------------------
+def _cue_color_srt(raw):
+    match = _FONT_COLOR_RE.search(raw)
+    if not match:
+        return None
+    color = match.group(1).upper()
+    if len(color) == 4:
+        # #RGB shorthand → #RRGGBB, the only form overlay entries accept
+        color = "#" + "".join(c * 2 for c in color[1:])
+    return color
+
+
+def _cue_color_vtt(raw):
+    match = _VTT_CLASS_RE.search(raw)
+    if match:
+        for cls in match.group(1).split(".")[1:]:
+            if cls in VTT_COLORS:
+                return VTT_COLORS[cls]
+    return None
+
+
+def _parse_blocks(lines, color_of, skip_header=False):
+    """Shared SRT/WebVTT loop: a timing line, then text lines until a blank line."""
+    start = end = None
+    text_lines = []
+    in_header = skip_header
+    skipping_block = False
+
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            if start is not None and text_lines:
+                raw = "\n".join(text_lines)
+                text = _clean_markup(raw)
+                if text:
+                    yield Cue(text, start, end, color_of(raw))
+            start = end = None
+            text_lines = []
+            in_header = skipping_block = False
+            continue
+        if in_header or skipping_block:
+            continue
+
+        if start is None:
+            timing = _TIMING_RE.match(line)
+            if timing:
+                start, end = _parse_times(timing.group(1), timing.group(2), number, line)
+            elif skip_header and line.startswith(("NOTE", "STYLE", "REGION")):
+                skipping_block = True
+            # Anything else before the timing line is a cue number or identifier
+        else:
+            text_lines.append(line)
+
+    if start is not None and text_lines:
+        raw = "\n".join(text_lines)
+        text = _clean_markup(raw)
+        if text:
+            yield Cue(text, start, end, color_of(raw))
+
+
+def parse_srt(lines):
+    """Yield Cues from the lines of an SRT file."""
+    return _parse_blocks(lines, _cue_color_srt)
+
+
+def parse_webvtt(lines):
+    """Yield Cues from the lines of a WebVTT file (header, NOTE, STYLE and REGION blocks skipped)."""
+    return _parse_blocks(lines, _cue_color_vtt, skip_header=True)
+
+
+# ----------------------------
+# ASS / SSA
+# ----------------------------
+def parse_ass(lines):
+    """Yield Cues from the Dialogue lines of an ASS/SSA file, with style colours applied."""
+    section = None
+    style_format = None
+    event_format = None
+    style_colors = {}
+
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1].lower()
+            continue
+
+        key, _, value = line.partition(":")
+        if section in ("v4+ styles", "v4 styles"):
+            if key == "Format":
+                style_format = [f.strip().lower() for f in value.split(",")]
+            elif key == "Style" and style_format:
+                fields = dict(zip(style_format, (f.strip() for f in value.split(","))))
+                color = fields.get("primarycolour", "")
+                if color.upper().startswith("&H"):
+                    style_colors[fields.get("name")] = _ass_color(color[2:].rstrip("&"))
+        elif section == "events":
+            if key == "Format":
+                event_format = [f.strip().lower() for f in value.split(",")]
+            elif key == "Dialogue" and event_format:
+                # Text is the last field and may itself contain commas
+                fields = dict(zip(event_format, value.split(",", len(event_format) - 1)))
+                raw = fields.get("text", "")
+                override = _ASS_COLOR_RE.search(raw)
+                color = _ass_color(override.group(1)) if override else style_colors.get(fields.get("style", "").strip())
+                text = raw.replace("\\N", "\n").replace("\\n", "\n").replace("\\h", " ")
+                text = _clean_markup(text)
+                if text:
+                    start, end = _parse_times(fields.get("start", ""), fields.get("end", ""), number, line)
+                    yield Cue(text, start, end, color)
+
+
+PARSERS = {"srt": parse_srt, "webvtt": parse_webvtt, "ass": parse_ass}
+
+
+def subtitle_format(filename):
+    """Parser name for a file name, or None if it isn't a subtitle file."""
+    name = filename.lower()
+    for ext, fmt in SUBTITLE_EXTENSIONS.items():
+        if name.endswith(ext):
+            return fmt
+    return None
+
+
+def iter_cues(source, fmt):
+    """
+    Stream Cues from a path or binary file object in the given format.
+
+    Text is decoded as UTF-8 (a BOM is dropped; undecodable bytes replaced).
+    A malformed cue timing raises ValueError with the line number and text.
+    """
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+            yield from PARSERS[fmt](f)
+    else:
+        stream = io.TextIOWrapper(source, encoding="utf-8-sig", errors="replace", newline="")
+        try:
+            yield from PARSERS[fmt](stream)
+        finally:
+            stream.detach()
@@ -0,0 +1,20 @@
+import chunked_render as cr
+
+
+def test_cuts_snap_to_the_nearest_keyframe():
+    chunks = cr.split_at_keyframes([12.0, 19.0, 31.0, 41.0], 60.0, 3)
+    assert chunks == [(0.0, 19.0), (19.0, 41.0), (41.0, 60.0)]
+
+
+def test_chunks_shorter_than_the_minimum_are_not_split_off():
+    chunks = cr.split_at_keyframes([2.0, 4.0, 6.0], 8.0, 4)
+    assert chunks == [(0.0, 8.0)]
+
+
+def test_without_keyframes_the_source_is_one_chunk():
+    assert cr.split_at_keyframes([], 60.0, 4) == [(0.0, 60.0)]
+
+
+def test_keyframes_outside_the_duration_are_ignored():
+    chunks = cr.split_at_keyframes([0.0, 30.0, 75.0], 60.0, 2)
+    assert chunks == [(0.0, 30.0), (30.0, 60.0)]
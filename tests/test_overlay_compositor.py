@@ -0,0 +1,47 @@
+import numpy as np
+import overlay_compositor as comp
+
+
+def _layer(x, y, start, end, w=40, h=20):
+    rgba = np.full((h, w, 4), 200, dtype=np.uint8)
+    return comp.OverlayLayer.from_rgba(rgba, x, y, start, end)
+
+
+def _bounds(spans):
+    return [(span.start, span.end, len(span.layers)) for span in spans]
+
+
+def test_spans_split_at_every_cue_boundary():
+    a, b = _layer(0, 0, 1.0, 3.0), _layer(0, 0, 2.0, 4.0)
+    spans = comp.segment_timeline([a, b])
+    assert _bounds(spans) == [(1.0, 2.0, 1), (2.0, 3.0, 1), (3.0, 4.0, 1)]
+    assert spans[0].layers == (a,) and spans[2].layers == (b,)
+
+
+def test_duration_pads_with_passthrough_and_trims_the_tail():
+    spans = comp.segment_timeline([_layer(0, 0, 1.0, 5.0)], duration=3.0)
+    assert _bounds(spans) == [(0.0, 1.0, 0), (1.0, 3.0, 1)]
+    assert spans[0].passthrough
+
+
+def test_gaps_between_cues_merge_into_one_passthrough_span():
+    spans = comp.segment_timeline([_layer(0, 0, 0.0, 1.0), _layer(0, 0, 3.0, 4.0)], duration=5.0)
+    assert _bounds(spans) == [(0.0, 1.0, 1), (1.0, 3.0, 0), (3.0, 4.0, 1), (4.0, 5.0, 0)]
+
+
+def test_overlapping_cues_are_flattened_into_their_union_box():
+    spans = comp.segment_timeline([_layer(10, 10, 0.0, 1.0), _layer(30, 20, 0.0, 1.0)])
+    (layer,) = spans[0].layers
+    assert (layer.x, layer.y, layer.w, layer.h) == (10, 10, 60, 30)
+
+
+def test_distant_cues_stay_separate_layers():
+    top, bottom = _layer(10, 10, 0.0, 1.0), _layer(10, 400, 0.0, 1.0)
+    spans = comp.segment_timeline([top, bottom])
+    assert spans[0].layers == (top, bottom)
+
+
+def test_unchanged_cluster_is_shared_between_spans():
+    subtitle = _layer(10, 400, 0.0, 4.0)
+    spans = comp.segment_timeline([subtitle, _layer(10, 10, 1.0, 2.0)])
+    assert all(span.layers[0] is subtitle for span in spans)
@@ -0,0 +1,30 @@
+import overlay_compositor as comp
+import smart_render as sr
+
+
+def _plan(ranges, keyframes, duration):
+    return [(s.start, s.end, s.reencode) for s in sr.plan_segments(ranges, keyframes, duration)]
+
+
+def test_only_gops_with_text_are_reencoded():
+    plan = _plan([(2.5, 3.0)], [2.0, 4.0, 6.0], 8.0)
+    assert plan == [(0.0, 2.0, False), (2.0, 4.0, True), (4.0, 8.0, False)]
+
+
+def test_neighbouring_gops_of_the_same_kind_are_merged():
+    plan = _plan([(1.0, 2.5), (4.5, 5.0)], [2.0, 4.0, 6.0], 8.0)
+    assert plan == [(0.0, 6.0, True), (6.0, 8.0, False)]
+
+
+def test_range_ending_on_a_keyframe_leaves_the_next_gop_alone():
+    plan = _plan([(0.5, 2.0)], [2.0], 4.0)
+    assert plan == [(0.0, 2.0, True), (2.0, 4.0, False)]
+
+
+def test_no_text_copies_the_whole_source():
+    assert _plan([], [2.0, 4.0], 6.0) == [(0.0, 6.0, False)]
+
+
+def test_text_ranges_skip_passthrough_spans():
+    spans = [comp.Span(0.0, 1.0), comp.Span(1.0, 2.0, (object(),)), comp.Span(2.0, 3.0)]
+    assert sr.text_ranges(spans) == [(1.0, 2.0)]
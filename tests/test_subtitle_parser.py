@@ -0,0 +1,24 @@
+import io
+import pytest
+import subtitle_parser as sp
+
+
+def _srt_cues(text):
+    return list(sp.iter_cues(io.BytesIO(text.encode("utf-8")), "srt"))
+
+
+def test_srt_font_color_short_hex_is_expanded():
+    cues = _srt_cues('1\n00:00:01,000 --> 00:00:02,000\n<font color="#fFf">White</font>\n')
+    assert cues == [sp.Cue("White", 1.0, 2.0, "#FFFFFF")]
+
+
+def test_srt_font_color_long_hex_is_kept():
+    cues = _srt_cues("1\n00:00:01,000 --> 00:00:02,500\n<font color='#ff8000'>Orange</font>\n")
+    assert cues[0].color == "#FF8000"
+    assert cues[0].end == 2.5
+
+
+def test_ass_bad_timestamp_names_the_line():
+    text = "[Events]\nFormat: Layer, Start, End, Style, Text\nDialogue: 0,0:00:01.00,bogus,Default,Hi\n"
+    with pytest.raises(ValueError, match="line 3"):
+        list(sp.iter_cues(io.BytesIO(text.encode("utf-8")), "ass"))
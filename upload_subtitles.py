@@ -15,6 +15,7 @@ import utility_functions as uf
 import image_generator as ig
 import position_helpers as ph
 import streamlit_logger as sl
+import encoder_profiles as ep
 # ==============================
 # Page Configuration
 # ==============================
@@ -285,9 +286,9 @@ if video_file:
 
             final.write_videofile(
                 output_path,
-                codec="libx264",
                 audio_codec="aac",
-                logger=logger
+                logger=logger,
+                **ep.moviepy_write_kwargs(size=final.size)
             )
 
             st.success("✅ Video generated successfully!")
@@ -1,6 +1,9 @@
+import hashlib
 import os
 from random import randint
 import tempfile
+import threading
+import workspace as ws
 
 # ==============================
 # Utility Functions
@@ -16,8 +19,46 @@ def hms_to_seconds(h: int, m: int, s: int):
     """Convert (h, m, s) → seconds."""
     return int(h) * 3600 + int(m) * 60 + int(s)
 
+def hms_to_ms(h: int, m: int, s: int, ms: int = 0):
+    """Convert (h, m, s, ms) → milliseconds."""
+    return hms_to_seconds(h, m, s) * 1000 + int(ms)
+
+def format_ms(ms: int, separator: str = "."):
+    """Format milliseconds as 'HH:MM:SS.mmm'."""
+    h, rem = divmod(int(ms), 3_600_000)
+    m, rem = divmod(rem, 60_000)
+    s, rem = divmod(rem, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{separator}{rem:03d}"
+
+def hex_to_rgb(hex_color: str):
+    """Convert '#RRGGBB' → (r, g, b)."""
+    return tuple(int(hex_color.lstrip("#")[i:i+2], 16) for i in (0, 2, 4))
+
+_digest_cache = {}
+_digest_lock = threading.Lock()
+
+def file_digest(path):
+    """Return the sha256 hex digest of a file, memoized on (path, size, mtime)."""
+    if not path or not os.path.exists(path):
+        return None
+    st_info = os.stat(path)
+    cache_key = (os.path.abspath(path), st_info.st_size, st_info.st_mtime_ns)
+    with _digest_lock:
+        if cache_key in _digest_cache:
+            return _digest_cache[cache_key]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    with _digest_lock:
+        _digest_cache[cache_key] = digest
+    return digest
+
 def save_temp_file(uploaded_file, suffix=".mp4"):
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=ws.get_workspace().area_dir("uploads"))
     tmp.write(uploaded_file.read())
     tmp.close()
     return tmp.name
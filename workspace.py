@@ -0,0 +1,273 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+# ==============================
+# Render Workspace
+# ==============================
+# Layout under WORKSPACE_ROOT:
+#   shared/<area>/...            content-addressed caches (uploads, fonts, proxies)
+#   sessions/<id>/outputs/...    finished renders for one browser session
+#   sessions/<id>/jobs/<job>/    scratch space for one render, removed when it ends
+# Every direct child of an area, outputs/ or jobs/ is one artifact for LRU eviction.
+WORKSPACE_ROOT = os.environ.get("WORKSPACE_ROOT") or os.path.join(tempfile.gettempdir(), "subtitle_workspace")
+QUOTA_BYTES = int(float(os.environ.get("WORKSPACE_QUOTA_MB", "5120")) * 1024 * 1024)
+SESSION_TTL = float(os.environ.get("WORKSPACE_SESSION_TTL", "3600"))
+ANONYMOUS_SESSION = "anonymous"
+
+_local = threading.local()
+
+
+def bind_session(session_id):
+    """Attribute job dirs and outputs created on this thread to ``session_id``."""
+    _local.session_id = session_id
+    get_workspace().touch_session(session_id)
+
+
+def current_session():
+    return getattr(_local, "session_id", None) or ANONYMOUS_SESSION
+
+
+def _size(path):
+    if os.path.isdir(path):
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for name in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, name))
+                except OSError:
+                    pass
+        return total
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class Workspace:
+    """
+    Owns every temporary file the app writes.
+
+    Keeps usage under ``quota_bytes`` by evicting least-recently-used
+    artifacts; pinned paths (open readers, running jobs) are never evicted.
+    Sessions idle for ``session_ttl`` seconds are removed along with their
+    outputs, since Streamlit gives no hook for a closed browser tab.
+    """
+
+    def __init__(self, root=WORKSPACE_ROOT, quota_bytes=QUOTA_BYTES, session_ttl=SESSION_TTL):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.session_ttl = session_ttl
+        self._last_used = {}
+        self._pins = Counter()
+        self._sessions = {}
+        self._session_end_hooks = []
+        self._lock = threading.RLock()
+        self._last_sweep = 0.0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    # ----------------------------
+    # Paths
+    # ----------------------------
+    def area_dir(self, area):
+        """Shared directory for one kind of cached artifact."""
+        path = os.path.join(self.root, "shared", area)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def session_dir(self, session_id=None):
+        path = os.path.join(self.root, "sessions", session_id or current_session())
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def output_path(self, filename, session_id=None):
+        """Where a finished render for this session should be written."""
+        out_dir = os.path.join(self.session_dir(session_id), "outputs")
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, filename)
+        self.touch(path)
+        return path
+
+    def make_job_dir(self, prefix="job_", session_id=None):
+        """A fresh, pinned scratch directory; pass it to remove_job_dir when done."""
+        jobs_dir = os.path.join(self.session_dir(session_id), "jobs")
+        os.makedirs(jobs_dir, exist_ok=True)
+        path = os.path.join(jobs_dir, f"{prefix}{uuid.uuid4().hex[:12]}")
+        os.makedirs(path)
+        self.pin(path)
+        return path
+
+    def remove_job_dir(self, path):
+        self.unpin(path)
+        _remove(path)
+        with self._lock:
+            self._last_used.pop(path, None)
+
+    # ----------------------------
+    # Usage tracking
+    # ----------------------------
+    def touch(self, path):
+        with self._lock:
+            self._last_used[os.path.abspath(path)] = time.time()
+
+    def pin(self, path):
+        with self._lock:
+            self._pins[os.path.abspath(path)] += 1
+
+    def unpin(self, path):
+        with self._lock:
+            path = os.path.abspath(path)
+            self._pins[path] -= 1
+            if self._pins[path] <= 0:
+                del self._pins[path]
+            self._last_used[path] = time.time()
+
+    def touch_session(self, session_id):
+        with self._lock:
+            self._sessions[session_id] = time.time()
+        self._sweep_stale_sessions()
+
+    def _artifacts(self):
+        parents = []
+        shared = os.path.join(self.root, "shared")
+        if os.path.isdir(shared):
+            parents += [os.path.join(shared, a) for a in os.listdir(shared)]
+        sessions = os.path.join(self.root, "sessions")
+        if os.path.isdir(sessions):
+            for sid in os.listdir(sessions):
+                parents += [os.path.join(sessions, sid, "outputs"), os.path.join(sessions, sid, "jobs")]
+        for parent in parents:
+            if os.path.isdir(parent):
+                for name in os.listdir(parent):
+                    yield os.path.abspath(os.path.join(parent, name))
+
+    def _is_pinned(self, path):
+        # A pin on a file inside a job dir protects the whole artifact
+        return any(p == path or p.startswith(path + os.sep) for p in self._pins)
+
+    def enforce_quota(self):
+        """Evict least-recently-used, unpinned artifacts until usage fits the quota."""
+        with self._lock:
+            artifacts = []
+            for path in self._artifacts():
+                try:
+                    last_used = self._last_used.get(path) or os.path.getmtime(path)
+                except OSError:
+                    continue
+                artifacts.append((last_used, path, _size(path)))
+            total = sum(size for _, _, size in artifacts)
+            for _, path, size in sorted(artifacts):
+                if total <= self.quota_bytes:
+                    break
+                if self._is_pinned(path):
+                    continue
+                _remove(path)
+                self._last_used.pop(path, None)
+                total -= size
+                self.evictions += 1
+                self.evicted_bytes += size
+            return total
+
+    # ----------------------------
+    # Session cleanup
+    # ----------------------------
+    def on_session_end(self, callback):
+        """Call ``callback(session_id)`` whenever a session is ended or expires."""
+        with self._lock:
+            self._session_end_hooks.append(callback)
+
+    def end_session(self, session_id):
+        """Delete a session's outputs and scratch space (pinned jobs are kept)."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._remove_session_files(session_id)
+            hooks = list(self._session_end_hooks)
+        # Outside the lock: hooks (e.g. the reader pool) take their own locks
+        for hook in hooks:
+            hook(session_id)
+
+    def _remove_session_files(self, session_id):
+        path = os.path.abspath(os.path.join(self.root, "sessions", session_id))
+        if not os.path.isdir(path):
+            return
+        if not self._is_pinned(path):
+            _remove(path)
+            return
+        for sub in ("outputs", "jobs"):
+            sub_dir = os.path.join(path, sub)
+            if os.path.isdir(sub_dir):
+                for name in os.listdir(sub_dir):
+                    child = os.path.join(sub_dir, name)
+                    if not self._is_pinned(child):
+                        _remove(child)
+
+    def _sweep_stale_sessions(self):
+        now = time.time()
+        stale = []
+        with self._lock:
+            if now - self._last_sweep < 60:
+                return
+            self._last_sweep = now
+            sessions = os.path.join(self.root, "sessions")
+            on_disk = os.listdir(sessions) if os.path.isdir(sessions) else []
+            for sid in on_disk:
+                last_seen = self._sessions.get(sid)
+                if last_seen is None:
+                    last_seen = os.path.getmtime(os.path.join(sessions, sid))
+                if now - last_seen >= self.session_ttl:
+                    stale.append(sid)
+        for sid in stale:
+            self.end_session(sid)
+
+    # ----------------------------
+    # Stats
+    # ----------------------------
+    def stats(self):
+        with self._lock:
+            by_area = Counter()
+            artifacts = 0
+            for path in self._artifacts():
+                rel = os.path.relpath(path, self.root).split(os.sep)
+                area = rel[1] if rel[0] == "shared" else rel[2]
+                by_area[area] += _size(path)
+                artifacts += 1
+            total = sum(by_area.values())
+            return {
+                "bytes": total,
+                "quota_bytes": self.quota_bytes,
+                "usage": total / self.quota_bytes if self.quota_bytes else 0.0,
+                "artifacts": artifacts,
+                "bytes_by_area": dict(by_area),
+                "active_sessions": len(self._sessions),
+                "pinned": len(self._pins),
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+            }
+
+
+_workspace = None
+_workspace_lock = threading.Lock()
+
+
+def get_workspace():
+    """The process-wide workspace shared by every Streamlit session."""
+    global _workspace
+    with _workspace_lock:
+        if _workspace is None:
+            _workspace = Workspace()
+        return _workspace